@@ -0,0 +1,296 @@
+#!/usr/bin/env python
+# coding=utf-8
+#
+# Copyright (C) [2021] [Susan Zakar], [sue.zakar@gmail.com]
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# Batch front end for Roof Maker.  Reads a CSV or JSON list of parameter sets
+# (using the same names as the extension options, e.g. roofwidth, sides, isbarn)
+# and writes one SVG per kit, spreading the kits over a pool of worker processes.
+# No Inkscape and no source document are needed; each kit is drawn into a blank
+# page.  With --format dxf or hpgl the kits are written straight to cutter files
+# by roof_export instead, without inkex.  --stream writes each SVG piece by piece
+# (roof_stream) instead of keeping the whole document, and --combined puts every
+# kit, each on its own layer, into one streamed SVG file (or stdout), so batches of
+# thousands of kits run in constant memory.  The peak memory use is reported.
+#
+#   python roof_batch.py kits.csv -o out -j 8
+#   python roof_batch.py kits.csv -o out --format dxf
+#   python roof_batch.py kits.csv -o out --cache
+#   python roof_batch.py kits.csv --combined roofs.svg
+#
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+# A4 page in millimetres with a single layer, like a new Inkscape document
+TEMPLATE = b"""<svg xmlns="http://www.w3.org/2000/svg"
+    xmlns:svg="http://www.w3.org/2000/svg"
+    xmlns:xlink="http://www.w3.org/1999/xlink"
+    xmlns:sodipodi="http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd"
+    xmlns:inkscape="http://www.inkscape.org/namespaces/inkscape"
+    width="210mm" height="297mm" viewBox="0 0 210 297">
+  <g inkscape:groupmode="layer" id="layer1" inkscape:label="Layer 1"/>
+</svg>
+"""
+
+NAMEKEYS = ('name', 'id')
+
+# cutter formats written by roof_export
+FORMATS = ('dxf', 'hpgl')
+
+# kits each worker may have queued or finished but not yet handed back
+WINDOW = 4
+
+
+def readkits(path):
+    # A JSON file holds a list of objects (or {"kits": [...]}).
+    # Anything else is read as CSV with a header row of option names;
+    # empty cells fall back to the extension defaults.
+    with open(path, newline='') as stream:
+        if path.lower().endswith('.json'):
+            kits = json.load(stream)
+            if isinstance(kits, dict):
+                kits = kits['kits']
+        else:
+            kits = [dict((k, v) for k, v in row.items() if v not in (None, ''))
+                    for row in csv.DictReader(stream)]
+    return kits
+
+
+def kitname(kit, index):
+    for key in NAMEKEYS:
+        if key in kit:
+            return str(kit[key])
+    return 'kit_%04d' % (index + 1)
+
+
+def kitargs(kit):
+    # turn a parameter set into the command line the extension would get from Inkscape
+    args = []
+    for key, value in kit.items():
+        if key in NAMEKEYS:
+            continue
+        if isinstance(value, bool):
+            value = str(value)
+        args.append('--%s=%s' % (key, value))
+    return args
+
+
+def checkkits(kits, fmt='svg'):
+    # parse every kit up front so a typo fails the batch before any work is done
+    if fmt != 'svg':
+        from roof_geometry import DEFAULTS, kitoptions
+        for index, kit in enumerate(kits):
+            params = kitparams(kit)
+            unknown = [key for key in params if key not in DEFAULTS]
+            if unknown:
+                sys.exit('%s: unknown option(s) %s' % (kitname(kit, index), ' '.join(unknown)))
+            try:
+                kitoptions(params)
+            except (ValueError, TypeError) as err:
+                sys.exit('%s: %s' % (kitname(kit, index), err))
+        return
+    from Roof_Maker import Roofmaker
+    parser = Roofmaker().arg_parser
+    for index, kit in enumerate(kits):
+        opts, unknown = parser.parse_known_args(kitargs(kit))
+        if unknown:
+            sys.exit('%s: unknown option(s) %s' % (kitname(kit, index), ' '.join(unknown)))
+
+
+def kitparams(kit):
+    # the parameter set as option values, for the geometry and exporters
+    return dict((key, value) for key, value in kit.items() if key not in NAMEKEYS)
+
+
+def makekit(job):
+    name, args, path, template, stream = job
+    start = time.perf_counter()
+    if template in FORMATS:
+        from roof_export import exportkit
+        kit = exportkit(args, path, template)
+    elif stream:
+        from roof_stream import svgStream
+        with open(path, 'wb') as out:
+            writer = svgStream(out, template, layers=False)
+            kit = writer.kit(args, name)
+            writer.close()
+    else:
+        from Roof_Maker import Roofmaker
+        ext = Roofmaker()
+        ext.parse_arguments(args)
+        ext.document = ext.load(io.BytesIO(template))
+        ext.effect()
+        with open(path, 'wb') as stream:
+            ext.save(stream)
+        kit = ext.kit
+    # how many places the cut lines cross, if the kit was checked
+    return name, path, time.perf_counter() - start, len(kit.collisions or [])
+
+
+def streamkit(job):
+    # one kit on a layer of its own, as the text that goes into a combined file
+    name, args, number, template = job
+    from roof_stream import svgStream
+    start = time.perf_counter()
+    out = io.BytesIO()
+    writer = svgStream(out, template)
+    head = out.tell()
+    kit = writer.kit(args, name, number)
+    return name, out.getvalue()[head:], time.perf_counter() - start, len(kit.collisions or [])
+
+
+def inorder(pool, fn, work, window):
+    # fn(job) for every job of work on pool, yielded in order; at most window jobs are
+    # submitted and not yet handed back, so memory doesn't grow with the batch
+    pending = deque()
+    for job in work:
+        if len(pending) >= window:
+            yield pending.popleft().result()
+        pending.append(pool.submit(fn, job))
+    while pending:
+        yield pending.popleft().result()
+
+
+def run(kits, outdir, jobs, template=TEMPLATE, fmt='svg', stream=False):
+    if not os.path.isdir(outdir):
+        os.makedirs(outdir)
+    work = []
+    for index, kit in enumerate(kits):
+        name = kitname(kit, index)
+        path = os.path.join(outdir, name + '.' + fmt)
+        if fmt == 'svg':
+            work.append((name, kitargs(kit), path, template, stream))
+        else:
+            work.append((name, kitparams(kit), path, fmt, False))
+    if jobs <= 1:
+        return [makekit(job) for job in work]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(inorder(pool, makekit, work, WINDOW*jobs))
+
+
+def runcombined(kits, path, jobs, template=TEMPLATE):
+    # every kit into one streamed SVG at path ('-' for stdout), in the order given;
+    # workers draw whole kits, and each is written as soon as its turn comes
+    from roof_stream import svgStream
+    out = sys.stdout.buffer if path == '-' else open(path, 'wb')
+    done = []
+    try:
+        writer = svgStream(out, template)
+        if jobs <= 1:
+            for index, kit in enumerate(kits):
+                name = kitname(kit, index)
+                start = time.perf_counter()
+                built = writer.kit(kitargs(kit), name, index + 1)
+                done.append((name, path, time.perf_counter() - start, len(built.collisions or [])))
+        else:
+            work = ((kitname(kit, index), kitargs(kit), index + 1, template) for index, kit in enumerate(kits))
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                for name, text, seconds, collisions in inorder(pool, streamkit, work, WINDOW*jobs):
+                    out.write(text)
+                    done.append((name, path, seconds, collisions))
+        writer.close()
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+    return done
+
+
+def peakrss():
+    # peak resident memory in megabytes of this process and of its largest worker,
+    # or None where the platform doesn't say
+    try:
+        import resource
+    except ImportError:
+        return None
+    unit = 1024*1024 if sys.platform == 'darwin' else 1024  # ru_maxrss is bytes on macOS, else KiB
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    workers = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return own*1024.0/unit/1024, workers*1024.0/unit/1024
+
+
+def main(argv=None):
+    pars = argparse.ArgumentParser(description="Generate many Roof Maker kits from a CSV or JSON parameter list")
+    pars.add_argument("kits", help="CSV or JSON file of parameter sets")
+    pars.add_argument("-o", "--outdir", default="roofkits",
+        help="Directory for the generated SVG files")
+    pars.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+        help="Number of worker processes")
+    pars.add_argument("--template", default=None,
+        help="SVG document to draw each kit into (default: blank A4 page in mm)")
+    pars.add_argument("--format", default="svg", choices=('svg',) + FORMATS,
+        help="Write SVG documents, or DXF or HPGL cutter files")
+    pars.add_argument("--cache", action='store_true',
+        help="Reuse kits from the on-disk kit cache and add new ones to it")
+    pars.add_argument("--cache_dir", default=None,
+        help="Kit cache directory (default roof_maker in the user cache directory)")
+    pars.add_argument("--stream", action='store_true',
+        help="Write each SVG piece by piece instead of keeping the whole document")
+    pars.add_argument("--combined", default=None,
+        help="Stream every kit, each on its own layer, into this one SVG file ('-' for stdout)")
+    args = pars.parse_args(argv)
+    if args.combined and args.format != 'svg':
+        pars.error('--combined writes SVG only')
+
+    kits = readkits(args.kits)
+    cache = None
+    if args.cache:
+        from roof_cache import kitCache
+        cache = kitCache(args.cache_dir)
+        before = cache.totals()
+        for kit in kits:
+            kit.setdefault('cache', 'True')
+            kit.setdefault('cache_dir', cache.directory)
+    checkkits(kits, args.format)
+    template = TEMPLATE
+    if args.template:
+        with open(args.template, 'rb') as stream:
+            template = stream.read()
+
+    start = time.perf_counter()
+    if args.combined:
+        done = runcombined(kits, args.combined, args.jobs, template)
+    else:
+        done = run(kits, args.outdir, args.jobs, template, args.format, args.stream)
+    elapsed = time.perf_counter() - start
+    rate = len(done)/elapsed if elapsed > 0 else 0.0
+    sys.stderr.write('%d kits in %.2fs (%.1f kits/s, %d workers)\n' % (len(done), elapsed, rate, max(1, args.jobs)))
+    peak = peakrss()
+    if peak is not None:
+        own, workers = peak
+        sys.stderr.write('peak memory: %.1fMB' % own + (', %.1fMB in the largest worker\n' % workers if args.jobs > 1 else '\n'))
+    bad = [name for name, path, seconds, collisions in done if collisions]
+    if bad:
+        sys.stderr.write('%d kit(s) with cut lines that cross: %s\n' % (len(bad), ' '.join(bad)))
+    if cache is not None:
+        # the workers' counts, from the totals kept in the cache directory
+        after = cache.totals()
+        sys.stderr.write('cache: %d hits, %d misses, %d evictions; graph nodes: %d hits, %d misses\n'
+            % tuple(after.get(name, 0) - before.get(name, 0)
+                    for name in ('hits', 'misses', 'evictions', 'nodehits', 'nodemisses')))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,256 @@
+#!/usr/bin/env python
+# coding=utf-8
+#
+# Copyright (C) [2021] [Susan Zakar], [sue.zakar@gmail.com]
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# Stage timings for Roof Maker.  For every kit in a grid of options (dormer sides,
+# barn or gable, stickout, dash or solid scores, small or very large roof) the kit is
+# built once while the arguments of each geometry stage are recorded; then each stage
+# is timed on its own by replaying those calls.  Results go to JSON, and compare
+# checks a run against a stored baseline.
+#
+#   python roof_bench.py run -o baseline.json
+#   python roof_bench.py run --quick -o new.json
+#   python roof_bench.py compare baseline.json new.json
+#
+
+import argparse
+import io
+import itertools
+import json
+import math
+import platform
+import sys
+import time
+
+import numpy
+from roof_geometry import RoofGeometry, build_roof, nodeCache, profileCache
+
+# the RoofGeometry methods that are timed; topnodescalc includes its ellipseg calls
+STAGES = ('nodesloc', 'topnodescalc', 'ellipseg', 'sidenodes', 'holenodes', 'makeChimney',
+          'makeTab', 'insetPolygon')
+
+GRID = {
+    'sides': (2, 3, 4, 6, 8, 12, 16, 24, 32, 48, 64, 96),
+    'isbarn': ('False', 'True'),
+    'stickout': (0.0, 0.3),
+    'scoretype': ('dash', 'solid'),
+    'roofwidth': (3.0, 120.0),
+}
+QUICKSIDES = (4, 12, 48)
+
+STYLE = {'stroke':'#000000','stroke-width':'0.25','fill':'#ffd5d5'}
+
+
+class uncachedGeometry(RoofGeometry):
+    # every build_roof and nodesloc call does all its work, so it can be timed
+    profiles = profileCache(0)
+    nodes = nodeCache(0)
+
+
+class stageRecorder(uncachedGeometry):
+    # build_roof with this geometry keeps a copy of the arguments of every stage call
+    def __init__(self):
+        super(stageRecorder, self).__init__()
+        self.calls = dict((name, []) for name in STAGES)
+
+
+def recording(name):
+    def method(self, *args):
+        # no stage changes its arguments, so they can be kept as they are
+        self.calls[name].append(args)
+        return getattr(uncachedGeometry, name)(self, *args)
+    return method
+
+for _name in STAGES:
+    setattr(stageRecorder, _name, recording(_name))
+
+
+def casekey(params):
+    return ' '.join('%s=%s' % (key, params[key]) for key in sorted(params))
+
+
+def grid(sides=None):
+    keys = sorted(GRID)
+    values = [sides if (key == 'sides' and sides) else GRID[key] for key in keys]
+    for combo in itertools.product(*values):
+        yield dict(zip(keys, combo))
+
+
+def best(func, setup, repeat, mintime=0.002):
+    # least wall time of one func(setup()) call, from repeat samples.  Fast stages are
+    # run enough times per sample to fill mintime, so timer noise doesn't swamp them.
+    arg = setup()
+    start = time.perf_counter()
+    func(arg)
+    once = time.perf_counter() - start
+    loops = max(1, int(math.ceil(mintime/once))) if once > 0 else 1000
+    times = []
+    for r in range(repeat):
+        args = [setup() for n in range(loops)]  # setup is not timed
+        start = time.perf_counter()
+        for arg in args:
+            func(arg)
+        times.append((time.perf_counter() - start)/loops)
+    return min(times)
+
+
+def benchcase(params, repeat):
+    from Roof_Maker import Roofmaker
+    from roof_batch import TEMPLATE, kitargs
+    from inkex import Group
+
+    ext = Roofmaker()
+    ext.parse_arguments(kitargs(params))
+    ext.document = ext.load(io.BytesIO(TEMPLATE))
+    scale = ext.svg.unittouu('1'+ext.options.unit)
+    options = vars(ext.options)
+
+    recorder = stageRecorder()
+    kit = build_roof(options, scale, recorder)
+    results = []
+    def add(stage, calls, seconds):
+        results.append({'case': casekey(params), 'params': params, 'stage': stage, 'calls': calls,
+                        'best': seconds, 'per_call': seconds/calls if calls else 0.0})
+
+    geo = uncachedGeometry()
+    for stage in STAGES:
+        calls = recorder.calls[stage]
+        if not calls:
+            continue
+        method = getattr(geo, stage)
+        def replay(args):
+            for arg in args:
+                method(*arg)
+        add(stage, len(calls), best(replay, lambda: calls, repeat))
+
+    # score dashing is done by makescores as the pieces are drawn
+    scorecalls = [(piece.scores, piece.dashlength) for piece in kit.pieces if piece.scores]
+    def dashes(args):
+        for scores, dashlength in args:
+            geo.makescores(scores, dashlength)
+    add('makescores', len(scorecalls), best(dashes, lambda: scorecalls, repeat))
+
+    def draw(layer):
+        for piece in kit.pieces:
+            ext.stringmeup(piece, layer, STYLE)
+    add('stringmeup', len(kit.pieces), best(draw, Group, repeat))
+
+    add('build_roof', 1, best(lambda g: build_roof(options, scale, g), uncachedGeometry, repeat))
+    return results
+
+
+def run(args):
+    sides = [int(s) for s in args.sides.split(',')] if args.sides else (QUICKSIDES if args.quick else None)
+    cases = list(grid(sides))
+    results = []
+    start = time.perf_counter()
+    for n, params in enumerate(cases):
+        results.extend(benchcase(params, args.repeat))
+        if args.verbose:
+            sys.stderr.write('%d/%d %s\n' % (n+1, len(cases), casekey(params)))
+    report = {
+        'version': 1,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': numpy.__version__,
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'cases': len(cases),
+        'results': results,
+    }
+    text = json.dumps(report, indent=1)
+    if args.output in (None, '-'):
+        sys.stdout.write(text + '\n')
+    else:
+        with open(args.output, 'w') as stream:
+            stream.write(text + '\n')
+    sys.stderr.write('%d cases, %d timings in %.1fs\n' % (len(cases), len(results), time.perf_counter() - start))
+    return 0
+
+
+def compare(args):
+    # A stage regresses when its time over all the cases both runs have (geometric
+    # mean of current/baseline) went up by more than the threshold.  Single cases
+    # are too noisy to judge alone, so they are only listed under a flagged stage.
+    with open(args.baseline) as stream:
+        base = json.load(stream)
+    with open(args.current) as stream:
+        current = json.load(stream)
+    old = dict(((r['case'], r['stage']), r) for r in base['results'])
+    ratios = {}
+    for r in current['results']:
+        b = old.get((r['case'], r['stage']))
+        if b is None or b['best'] <= 0 or r['best'] <= 0:
+            continue
+        ratios.setdefault(r['stage'], []).append((r['best']/b['best'], r['case'], b['best'], r['best']))
+
+    flagged = []
+    sys.stdout.write('%-14s %6s %9s %9s %9s\n' % ('stage', 'cases', 'geomean', 'best', 'worst'))
+    for stage in sorted(ratios):
+        rs = sorted(ratios[stage], reverse=True)
+        gmean = math.exp(sum(math.log(x[0]) for x in rs)/len(rs))
+        mark = ''
+        if gmean > 1.0 + args.threshold:
+            flagged.append((stage, gmean, rs))
+            mark = '  REGRESSION'
+        sys.stdout.write('%-14s %6d %8.2fx %8.2fx %8.2fx%s\n' % (stage, len(rs), gmean, rs[-1][0], rs[0][0], mark))
+    if not ratios:
+        sys.stdout.write('no cases in common\n')
+        return 2
+    if flagged:
+        sys.stdout.write('\n%d stage(s) slower by more than %.0f%%; worst cases:\n' % (len(flagged), 100*args.threshold))
+        for stage, gmean, rs in flagged:
+            for ratio, case, b, c in rs[:args.show]:
+                sys.stdout.write('  %-14s %6.2fx  %9.3fms -> %9.3fms  %s\n' % (stage, ratio, 1000*b, 1000*c, case))
+        return 1
+    sys.stdout.write('\nno stage slower by more than %.0f%%\n' % (100*args.threshold))
+    return 0
+
+
+def main(argv=None):
+    pars = argparse.ArgumentParser(description="Time the Roof Maker geometry stages over a grid of kits")
+    sub = pars.add_subparsers(dest='command')
+    prun = sub.add_parser('run', help="Time every stage over the option grid")
+    prun.add_argument("-o", "--output", default=None,
+        help="JSON file for the results (default: standard output)")
+    prun.add_argument("--repeat", type=int, default=5,
+        help="Timed tries per stage; the best is kept")
+    prun.add_argument("--quick", action='store_true',
+        help="Only %s dormer sides" % ','.join(str(s) for s in QUICKSIDES))
+    prun.add_argument("--sides", default=None,
+        help="Comma separated dormer sides to use instead of the grid's")
+    prun.add_argument("-v", "--verbose", action='store_true',
+        help="Report each case as it finishes")
+    pcmp = sub.add_parser('compare', help="Check a run against a baseline run")
+    pcmp.add_argument("baseline", help="JSON from an earlier run")
+    pcmp.add_argument("current", help="JSON from the run to check")
+    pcmp.add_argument("--threshold", type=float, default=0.10,
+        help="Flag stages that got slower (geometric mean over the cases) by more than this fraction")
+    pcmp.add_argument("--show", type=int, default=5,
+        help="Number of worst cases to list for each flagged stage")
+    args = pars.parse_args(argv)
+    if args.command == 'run':
+        return run(args)
+    if args.command == 'compare':
+        return compare(args)
+    pars.print_help()
+    return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,294 @@
+#!/usr/bin/env python
+# coding=utf-8
+#
+# Copyright (C) [2021] [Susan Zakar], [sue.zakar@gmail.com]
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# On-disk cache of finished kits for Roof Maker.  An entry is found by the sha256
+# of the normalized options (lengths already scaled to user units), the options
+# that change the drawing, and a hash of the Roof Maker source files, so editing
+# the code never serves stale kits.  Entries are pickled dicts (the Kit and
+# whatever serialized output the caller keeps with it).  The directory is kept
+# under a size limit by dropping the least recently used entries.  The results
+# of build_roof's graph nodes can be kept in the same directory (nodeStore), so a
+# run that changes one option rebuilds only the nodes that read it.
+#
+# stats.json in the directory keeps the hit and miss totals of every run and the
+# bytes the entries take up, so a put needs no scan of the directory until the
+# cache has grown past its limit.  Counts are saved once per kit (and at exit).
+#
+
+import atexit
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import weakref
+
+try:
+    import fcntl
+except ImportError:  # Windows: the totals may miss counts from concurrent runs
+    fcntl = None
+
+from roof_geometry import RoofGeometry, build_roof, kitoptions, nodeCache
+
+# files whose contents go into every key
+CODEFILES = ('roof_geometry.py', 'roof_layout.py', 'roof_export.py', 'roof_validate.py', 'roof_cache.py',
+             'roof_stream.py', 'Roof_Maker.py')
+
+# options that change the drawing but not the geometry
+RENDERKEYS = ('precision', 'relative', 'instances')
+
+_codeversion = None
+
+# caches with counts not yet saved
+_unsaved = weakref.WeakSet()
+
+
+def codeversion():
+    # hash of the source files next to this one, worked out once per process
+    global _codeversion
+    if _codeversion is None:
+        digest = hashlib.sha256()
+        here = os.path.dirname(os.path.abspath(__file__))
+        for name in CODEFILES:
+            path = os.path.join(here, name)
+            if os.path.exists(path):
+                with open(path, 'rb') as stream:
+                    digest.update(name.encode() + b'\0' + stream.read())
+        _codeversion = digest.hexdigest()
+    return _codeversion
+
+
+def defaultdir():
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'roof_maker')
+
+
+class kitCache(object):
+    # Entries live in directory/<first two hex digits>/<key>.pickle; an entry's file
+    # time is its last use.  hits, misses, writes and evictions count this instance's
+    # work with kits; graph nodes (node=True) are counted apart, in nodehits, nodemisses
+    # and nodewrites.  totals() adds up every instance that has used the directory.
+    def __init__(self, directory=None, maxbytes=256*1024*1024):
+        self.directory = directory or defaultdir()
+        self.maxbytes = maxbytes
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.nodehits = 0
+        self.nodemisses = 0
+        self.nodewrites = 0
+        self.pending = {}
+
+    def key(self, params, scale=1.0, extra=()):
+        # params are extension option values; extra is anything else the entry depends on
+        opts = kitoptions(params, scale)
+        for name in RENDERKEYS:
+            if name in params:
+                opts[name] = str(params[name])
+        text = json.dumps([codeversion(), opts, list(extra)], sort_keys=True, default=str)
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], key + '.pickle')
+
+    def get(self, key, node=False):
+        # the stored entry, or None
+        path = self.path(key)
+        try:
+            with open(path, 'rb') as stream:
+                entry = pickle.load(stream)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            self.count('misses', node)
+            return None
+        try:
+            os.utime(path)  # most recently used
+        except OSError:
+            pass
+        self.count('hits', node)
+        if not node:
+            self.save()
+        return entry
+
+    def count(self, name, node):
+        # one more kit (or node) hit, miss or write
+        if node:
+            name = 'node' + name
+        setattr(self, name, getattr(self, name) + 1)
+        self.record(**{name: 1})
+
+    def put(self, key, entry, node=False):
+        path = self.path(key)
+        folder = os.path.dirname(path)
+        if not os.path.isdir(folder):
+            os.makedirs(folder, exist_ok=True)
+        # write then rename, so a reader never sees half an entry
+        handle, temp = tempfile.mkstemp(dir=folder, suffix='.tmp')
+        with os.fdopen(handle, 'wb') as stream:
+            pickle.dump(entry, stream, protocol=pickle.HIGHEST_PROTOCOL)
+            size = stream.tell()
+        try:
+            size -= os.stat(path).st_size  # an entry written over
+        except OSError:
+            pass
+        os.replace(temp, path)
+        self.count('writes', node)
+        self.record(bytes=size)
+        if not node:
+            self.save()
+
+    def entries(self):
+        # (last use, size, path) of every entry
+        found = []
+        if not os.path.isdir(self.directory):
+            return found
+        for folder in os.scandir(self.directory):
+            if folder.is_dir():
+                for item in os.scandir(folder.path):
+                    if item.name.endswith('.pickle'):
+                        info = item.stat()
+                        found.append((info.st_mtime, info.st_size, item.path))
+        return found
+
+    def trim(self):
+        # drop least recently used entries until the cache is under maxbytes;
+        # returns how many went and the bytes left
+        found = self.entries()
+        total = sum(size for used, size, path in found)
+        evicted = 0
+        if total <= self.maxbytes:
+            return evicted, total
+        for used, size, path in sorted(found):
+            if total <= self.maxbytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+        self.evictions += evicted
+        return evicted, total
+
+    def record(self, **counts):
+        # add counts to those waiting for save()
+        for name, count in counts.items():
+            self.pending[name] = self.pending.get(name, 0) + count
+        _unsaved.add(self)
+
+    def save(self):
+        # add the waiting counts to the running totals kept in the directory, and trim
+        # the cache when its bytes go over maxbytes (or aren't known yet).  The file is
+        # locked where the platform allows it, since batch workers share the totals;
+        # a scan can count a worker's newest entry twice, which only trims it sooner.
+        if not self.pending:
+            return
+        counts, self.pending = self.pending, {}
+        _unsaved.discard(self)
+        try:
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory, exist_ok=True)
+            with open(os.path.join(self.directory, 'stats.json'), 'a+') as stream:
+                if fcntl is not None:
+                    fcntl.flock(stream, fcntl.LOCK_EX)
+                stream.seek(0)
+                totals = self.readtotals(stream.read())
+                known = 'bytes' in totals
+                for name, count in counts.items():
+                    totals[name] = totals.get(name, 0) + count
+                if 'bytes' in counts and (not known or totals['bytes'] > self.maxbytes):
+                    evicted, totals['bytes'] = self.trim()
+                    totals['evictions'] = totals.get('evictions', 0) + evicted
+                stream.seek(0)
+                stream.truncate()
+                json.dump(totals, stream)
+        except OSError:
+            pass
+
+    def readtotals(self, text):
+        try:
+            return json.loads(text)
+        except ValueError:
+            return {'hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0}
+
+    def totals(self):
+        try:
+            with open(os.path.join(self.directory, 'stats.json')) as stream:
+                return self.readtotals(stream.read())
+        except OSError:
+            return self.readtotals('')
+
+    def stats(self):
+        found = self.entries()
+        return {'hits': self.hits, 'misses': self.misses, 'writes': self.writes,
+                'evictions': self.evictions, 'nodehits': self.nodehits, 'nodemisses': self.nodemisses,
+                'nodewrites': self.nodewrites, 'entries': len(found),
+                'bytes': sum(size for used, size, path in found), 'maxbytes': self.maxbytes}
+
+    def clear(self):
+        for used, size, path in self.entries():
+            os.remove(path)
+        self.record(bytes=-self.totals().get('bytes', 0))
+        self.save()
+
+
+@atexit.register
+def saveall():
+    for cache in list(_unsaved):
+        cache.save()
+
+
+class nodeStore(object):
+    # a kitCache as the backing store of a roof_geometry.nodeCache
+    def __init__(self, cache):
+        self.cache = cache
+
+    def digest(self, key):
+        text = json.dumps([codeversion(), 'node', key], default=str)
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def get(self, key):
+        entry = self.cache.get(self.digest(key), node=True)
+        return None if entry is None else (entry['node'], entry['tabstats'])
+
+    def put(self, key, value):
+        result, tabstats = value
+        self.cache.put(self.digest(key), {'node': result, 'tabstats': tabstats}, node=True)
+
+
+def cachedgeometry(cache, geo=None):
+    # geo (default a new RoofGeometry) with its graph nodes kept in cache as well
+    if geo is None:
+        geo = RoofGeometry()
+    geo.nodes = nodeCache(backing=nodeStore(cache))
+    return geo
+
+
+def cachedkit(params, scale=1.0, cache=None):
+    # build_roof through the cache: the stored Kit if there is one, else build it
+    # (reusing any stored graph nodes) and keep it
+    if cache is None:
+        cache = kitCache()
+    key = cache.key(params, scale, ('kit',))
+    entry = cache.get(key)
+    if entry is not None:
+        return entry['kit']
+    kit = build_roof(params, scale, cachedgeometry(cache))
+    cache.put(key, {'kit': kit})
+    return kit
@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+# coding=utf-8
+#
+# Copyright (C) [2021] [Susan Zakar], [sue.zakar@gmail.com]
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# Cold start timings for Roof Maker: what a fresh process, as Inkscape starts one
+# for every apply, spends its time on.  Each run is a new Python that draws one kit
+# and times its phases:
+#   python     - the interpreter starting up (a bare "python -c pass")
+#   import     - importing roof_geometry, then Roof_Maker (inkex, lxml) or roof_export
+#   options    - parsing the options and loading the document
+#   geometry   - build_roof (numpy is first used here), layout and checking
+#   serialize  - drawing the pieces and writing the SVG, or writing the DXF
+#   other      - the rest of the process's wall time (mostly shutting down)
+#
+#   python roof_coldstart.py --runs 10
+#   python roof_coldstart.py --format dxf sides=48 isbarn=True -o cold.json
+#
+# A timed run imports nothing else of its own, so it pays only for Roof Maker.
+#
+
+import sys
+import time
+
+PHASES = ('python', 'import', 'options', 'geometry', 'serialize', 'other')
+
+# blank A4 page in millimetres with a single layer
+TEMPLATE = b"""<svg xmlns="http://www.w3.org/2000/svg"
+    xmlns:inkscape="http://www.inkscape.org/namespaces/inkscape"
+    width="210mm" height="297mm" viewBox="0 0 210 297">
+  <g inkscape:groupmode="layer" id="layer1" inkscape:label="Layer 1"/>
+</svg>
+"""
+
+
+class stageClock(object):
+    # just enough of roof_profile.stageProfiler for Roofmaker.drawkit: adds up the
+    # time spent in each stage and watches nothing
+    def __init__(self):
+        self.times = {}
+    def stage(self, name):
+        return clockStage(self.times, name)
+    def piece(self, name):
+        return clockStage({}, name)
+    def watch(self, obj, names=None):
+        return obj
+    def built(self, kit):
+        pass
+
+
+class clockStage(object):
+    def __init__(self, times, name):
+        self.times = times
+        self.name = name
+    def __enter__(self):
+        self.begin = time.perf_counter()
+    def __exit__(self, *exc):
+        self.times[self.name] = self.times.get(self.name, 0.0) + time.perf_counter() - self.begin
+
+
+def child(fmt, params):
+    # one cold run; prints the phase times as a dict
+    times = {}
+    t = time.perf_counter()
+    import roof_geometry
+    if fmt == 'svg':
+        import io
+        from Roof_Maker import Roofmaker
+        times['import'] = time.perf_counter() - t
+        t = time.perf_counter()
+        ext = Roofmaker()
+        ext.parse_arguments(['--%s=%s' % item for item in params.items()])
+        ext.document = ext.load(io.BytesIO(TEMPLATE))
+        times['options'] = time.perf_counter() - t
+        t = time.perf_counter()
+        clock = stageClock()
+        ext.drawkit(clock)
+        drawn = time.perf_counter() - t
+        draw = clock.times.get('stringmeup', 0.0)
+        times['geometry'] = drawn - draw
+        t = time.perf_counter()
+        ext.save(io.BytesIO())
+        times['serialize'] = draw + time.perf_counter() - t
+    else:
+        import io
+        from roof_export import MM_PER_UNIT, dxfWriter, hpglWriter, writekit
+        times['import'] = time.perf_counter() - t
+        t = time.perf_counter()
+        scale = MM_PER_UNIT[roof_geometry.kitoptions(params)['unit']]
+        times['options'] = time.perf_counter() - t
+        t = time.perf_counter()
+        kit = roof_geometry.build_roof(params, scale)
+        opts = kit.options
+        if opts['layout']:
+            from roof_layout import layoutpieces
+            kit.layout = layoutpieces(kit.pieces, opts['sheet_width'], opts['sheet_height'], opts['sheet_margin'],
+                opts['piece_spacing'], opts['layout_rotate'], scale=scale)
+        if opts['validate']:
+            from roof_validate import checkkit
+            kit.collisions = checkkit(kit)
+        times['geometry'] = time.perf_counter() - t
+        t = time.perf_counter()
+        writer = {'dxf': dxfWriter, 'hpgl': hpglWriter}[fmt]
+        writekit(writer(io.StringIO()), kit)
+        times['serialize'] = time.perf_counter() - t
+    sys.stdout.write(repr(times) + '\n')
+
+
+def wall(command):
+    # wall time of running command, and its output
+    import subprocess
+    t = time.perf_counter()
+    out = subprocess.run(command, stdout=subprocess.PIPE, check=True).stdout
+    return time.perf_counter() - t, out
+
+
+def median(values):
+    values = sorted(values)
+    n = len(values)
+    return values[n//2] if n % 2 else (values[n//2 - 1] + values[n//2])/2
+
+
+def main(argv=None):
+    import argparse
+    import ast
+    import json
+    import platform
+    pars = argparse.ArgumentParser(description="Time what a fresh Roof Maker process spends its time on")
+    pars.add_argument("params", nargs='*', help="Kit options as name=value (default: the extension defaults)")
+    pars.add_argument("--runs", type=int, default=10, help="Fresh processes to time; the median is reported")
+    pars.add_argument("--format", default='svg', choices=('svg', 'dxf', 'hpgl'),
+        help="Draw an SVG document through the extension, or write a cutter file")
+    pars.add_argument("-o", "--output", default=None, help="Also write every run's times to this JSON file")
+    args = pars.parse_args(argv)
+    params = dict(p.split('=', 1) for p in args.params)
+
+    runs = []
+    for n in range(args.runs):
+        bare = wall([sys.executable, '-c', 'pass'])[0]
+        total, out = wall([sys.executable, __file__, '--child', args.format] + args.params)
+        times = ast.literal_eval(out.decode().strip().splitlines()[-1])
+        times['python'] = bare
+        times['other'] = total - bare - sum(times[name] for name in PHASES[1:-1])
+        times['total'] = total
+        runs.append(times)
+
+    sys.stdout.write('%d cold %s runs of %s\n' % (args.runs, args.format, ' '.join(args.params) or 'the defaults'))
+    sys.stdout.write('%-10s %9s %9s %6s\n' % ('phase', 'median', 'best', 'share'))
+    whole = median([r['total'] for r in runs])
+    for name in PHASES + ('total',):
+        values = [r[name] for r in runs]
+        sys.stdout.write('%-10s %7.1fms %7.1fms %5.0f%%\n' % (name, 1000*median(values), 1000*min(values),
+                                                             100*median(values)/whole))
+    if args.output:
+        report = {'version': 1, 'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                  'python': platform.python_version(), 'platform': platform.platform(),
+                  'format': args.format, 'params': params, 'runs': runs}
+        with open(args.output, 'w') as stream:
+            stream.write(json.dumps(report, indent=1) + '\n')
+    return 0
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--child']:
+        # a timed run: roof_coldstart.py --child format name=value ...
+        child(sys.argv[2], dict(p.split('=', 1) for p in sys.argv[3:]))
+    else:
+        sys.exit(main())
@@ -0,0 +1,253 @@
+#!/usr/bin/env python
+# coding=utf-8
+#
+# Copyright (C) [2021] [Susan Zakar], [sue.zakar@gmail.com]
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# A warm Roof Maker for Inkscape.  Every apply or live preview starts a new Python,
+# which imports inkex and lxml before any geometry is done, and that takes longer
+# than the kit itself.  The daemon keeps one interpreter running, with inkex loaded
+# and the profile and build graph caches full, and listens on a Unix socket:
+#
+#   python roof_daemon.py            run it (in the foreground; --socket to choose where)
+#   python roof_daemon.py --status   is one running, and how busy has it been
+#   python roof_daemon.py --stop     stop it
+#
+# Roof_Maker.py tries forward() before it imports anything else, so while a daemon
+# is running Inkscape gets the document from it; when there is none, or it can't
+# answer, the extension runs in its own process as always.  A daemon stops itself
+# when the Roof Maker source files change under it.
+#
+# A request is one line of JSON (argv, cwd, DOCUMENT_PATH); the answer is a line of
+# JSON (status, stderr, length) followed by length bytes of the finished document.
+# Only the standard library is imported until the daemon starts serving.
+#
+
+import json
+import os
+import socket
+import sys
+import tempfile
+
+# the files whose changes make a running daemon out of date
+CODEFILES = ('Roof_Maker.py', 'roof_geometry.py', 'roof_layout.py', 'roof_export.py',
+             'roof_cache.py', 'roof_validate.py', 'roof_profile.py', 'roof_daemon.py')
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# seconds Roof_Maker.py waits on the daemon before drawing the kit itself
+# (ROOF_MAKER_DAEMON_TIMEOUT); a big kit takes a second or two at most
+TIMEOUT = 30.0
+
+
+def socketpath():
+    # ROOF_MAKER_SOCKET, or roof_maker.sock in the user's runtime directory
+    path = os.environ.get('ROOF_MAKER_SOCKET')
+    if path:
+        return path
+    base = os.environ.get('XDG_RUNTIME_DIR')
+    if base and os.path.isdir(base):
+        return os.path.join(base, 'roof_maker.sock')
+    return os.path.join(tempfile.gettempdir(), 'roof_maker-%d.sock' % os.getuid())
+
+
+def codestamp():
+    # modification times of the source files
+    stamp = []
+    for name in CODEFILES:
+        try:
+            stamp.append(os.stat(os.path.join(HERE, name)).st_mtime_ns)
+        except OSError:
+            stamp.append(None)
+    return stamp
+
+
+def readline(stream):
+    line = stream.readline()
+    if not line.endswith(b'\n'):
+        raise EOFError('connection closed')
+    return json.loads(line.decode('utf-8'))
+
+
+def ask(request, path=None, timeout=None):
+    # send request to the daemon and return (answer, document bytes); OSError
+    # (socket.timeout among them) or EOFError if there is no daemon, it went away
+    # or it took more than timeout seconds over any one read
+    path = path or socketpath()
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conn.settimeout(0.5)
+        conn.connect(path)
+        conn.settimeout(timeout)
+        conn.sendall(json.dumps(request).encode('utf-8') + b'\n')
+        stream = conn.makefile('rb')
+        answer = readline(stream)
+        body = stream.read(answer.get('length', 0))
+        if len(body) != answer.get('length', 0):
+            raise EOFError('connection closed')
+        return answer, body
+    finally:
+        conn.close()
+
+
+def forward(argv):
+    # Have a running daemon do the work of "Roof_Maker.py argv", writing what it sends
+    # back to stdout and stderr.  True if it did; False to run the extension here.
+    if os.environ.get('ROOF_MAKER_DAEMON') == '0' or not hasattr(socket, 'AF_UNIX'):
+        return False
+    path = socketpath()
+    if not os.path.exists(path):
+        return False
+    # Inkscape passes the document as a file; anything else is left to the extension
+    if not argv or argv[-1].startswith('-') or not os.path.isfile(argv[-1]):
+        return False
+    argv = argv[:-1] + [os.path.abspath(argv[-1])]
+    request = {'argv': argv, 'cwd': os.getcwd(), 'document_path': os.environ.get('DOCUMENT_PATH')}
+    try:
+        timeout = float(os.environ.get('ROOF_MAKER_DAEMON_TIMEOUT', TIMEOUT))
+    except ValueError:
+        timeout = TIMEOUT
+    try:
+        answer, body = ask(request, path, timeout)
+    except (OSError, EOFError, ValueError):
+        # a daemon that is stuck or half gone: run here rather than wait on it
+        return False
+    if answer.get('status') == 'stale':
+        return False
+    sys.stdout.buffer.write(body)
+    sys.stdout.flush()
+    sys.stderr.write(answer.get('stderr', ''))
+    if answer.get('status'):
+        sys.exit(answer['status'])
+    return True
+
+
+class roofDaemon(object):
+    # runs the extension for each request in this process
+    def __init__(self, path):
+        self.path = path
+        self.stamp = codestamp()
+        self.served = 0
+        self.failed = 0
+        self.running = False
+
+    def runextension(self, request):
+        # (status, stderr text, document bytes) for one run of the extension
+        import contextlib
+        import io
+        import traceback
+        from Roof_Maker import Roofmaker
+        output = io.BytesIO()
+        errors = io.StringIO()
+        status = 0
+        if request.get('document_path'):
+            os.environ['DOCUMENT_PATH'] = request['document_path']
+        else:
+            os.environ.pop('DOCUMENT_PATH', None)
+        os.chdir(request.get('cwd') or HERE)
+        with contextlib.redirect_stderr(errors):
+            try:
+                Roofmaker().run(request['argv'], output=output)
+            except SystemExit as err:
+                status = err.code if isinstance(err.code, int) else 1
+            except Exception:
+                traceback.print_exc(file=errors)
+                status = 1
+        return status, errors.getvalue(), output.getvalue()
+
+    def handle(self, conn):
+        stream = conn.makefile('rb')
+        try:
+            request = readline(stream)
+        except (OSError, EOFError, ValueError):
+            return
+        command = request.get('command')
+        body = b''
+        if command == 'stop':
+            self.running = False
+            answer = {'status': 0}
+        elif command == 'status':
+            answer = {'status': 0, 'pid': os.getpid(), 'served': self.served, 'failed': self.failed}
+        elif codestamp() != self.stamp:
+            # Roof Maker was updated: let the client run it and make way for a new daemon
+            self.running = False
+            answer = {'status': 'stale'}
+        else:
+            status, errors, body = self.runextension(request)
+            self.served += 1
+            if status:
+                self.failed += 1
+            answer = {'status': status, 'stderr': errors}
+        answer['length'] = len(body)
+        try:
+            conn.sendall(json.dumps(answer).encode('utf-8') + b'\n' + body)
+        except OSError:
+            pass
+
+    def serve(self):
+        # answer requests one at a time until stopped
+        import Roof_Maker  # the slow imports, done once
+        if os.path.exists(self.path):
+            try:
+                ask({'command': 'status'}, self.path)
+                sys.exit('a daemon is already listening on ' + self.path)
+            except (OSError, EOFError, ValueError):
+                os.remove(self.path)  # left by one that didn't stop cleanly
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        umask = os.umask(0o077)  # the socket is for this user only
+        try:
+            server.bind(self.path)
+        finally:
+            os.umask(umask)
+        server.listen(8)
+        self.running = True
+        try:
+            while self.running:
+                conn, addr = server.accept()
+                with conn:
+                    self.handle(conn)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.close()
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+
+def main(argv=None):
+    import argparse
+    pars = argparse.ArgumentParser(description="Keep a warm Roof Maker running for Inkscape to use")
+    pars.add_argument("--socket", default=None,
+        help="Unix socket to listen on (default: $ROOF_MAKER_SOCKET, or roof_maker.sock in the runtime directory)")
+    pars.add_argument("--stop", action='store_true', help="Stop the running daemon")
+    pars.add_argument("--status", action='store_true', help="Say whether a daemon is running")
+    args = pars.parse_args(argv)
+    path = args.socket or socketpath()
+    if args.stop or args.status:
+        try:
+            answer, body = ask({'command': 'stop' if args.stop else 'status'}, path, timeout=5)
+        except (OSError, EOFError, ValueError):
+            sys.exit('no daemon on ' + path)
+        if args.status:
+            print('daemon %d on %s: %d runs, %d failed' % (answer['pid'], path, answer['served'], answer['failed']))
+        return
+    roofDaemon(path).serve()
+
+
+if __name__ == '__main__':
+    main()
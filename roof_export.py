@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+# coding=utf-8
+#
+# Copyright (C) [2021] [Susan Zakar], [sue.zakar@gmail.com]
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# Cutter output for Roof Maker.  Writes the pieces of a Kit straight to DXF (R12)
+# or HPGL, with the outlines and holes on a CUT layer (pen 1) and the score lines
+# on a SCORE layer (pen 2).  Entities are written to the stream as each piece is
+# walked, so nothing is kept but the kit itself; there is no inkex or lxml here.
+# Coordinates are in millimetres with y pointing up, and the kit's lower left
+# corner at 0,0.
+#
+#   kit = build_roof({'roofwidth': 7, 'sides': 12}, MM_PER_UNIT['in'])
+#   with open('roof.dxf', 'w') as stream:
+#       writekit(dxfWriter(stream), kit)
+#
+
+import io
+
+from roof_geometry import DEFAULTS, IDENTITY, RoofGeometry, build_roof, kitoptions
+from roof_layout import compose, layoutpieces, piecebox
+
+MM_PER_UNIT = {'in': 25.4, 'px': 25.4/96, 'pt': 25.4/72, 'ft': 304.8, 'yd': 914.4,
+               'mm': 1.0, 'cm': 10.0, 'm': 1000.0, 'km': 1000000.0}
+
+FORMATS = ('dxf', 'hpgl')
+
+CUT = 'CUT'
+SCORE = 'SCORE'
+
+
+class dxfWriter(object):
+    # AutoCAD R12 DXF, which every cutter and CAD program reads: POLYLINE
+    # entities for the closed cut lines and LINE entities for the score marks.
+    # R12 has no header variable for the drawing units, so the millimetres are
+    # only in the numbers.
+    LAYERS = ((CUT, 7), (SCORE, 3))  # layer name, colour number
+
+    def __init__(self, stream):
+        self.stream = stream
+        w = stream.write
+        w('0\nSECTION\n2\nHEADER\n9\n$ACADVER\n1\nAC1009\n0\nENDSEC\n')
+        w('0\nSECTION\n2\nTABLES\n')
+        w('0\nTABLE\n2\nLTYPE\n70\n1\n0\nLTYPE\n2\nCONTINUOUS\n70\n0\n3\nSolid line\n72\n65\n73\n0\n40\n0.0\n0\nENDTAB\n')
+        w('0\nTABLE\n2\nLAYER\n70\n%d\n' % len(self.LAYERS))
+        for name, colour in self.LAYERS:
+            w('0\nLAYER\n2\n%s\n70\n0\n62\n%d\n6\nCONTINUOUS\n' % (name, colour))
+        w('0\nENDTAB\n0\nENDSEC\n0\nSECTION\n2\nENTITIES\n')
+
+    def polygon(self, points, layer):
+        if not points:
+            return
+        w = self.stream.write
+        w('0\nPOLYLINE\n8\n%s\n66\n1\n70\n1\n10\n0.0\n20\n0.0\n30\n0.0\n' % layer)
+        for x, y in points:
+            w('0\nVERTEX\n8\n%s\n10\n%.4f\n20\n%.4f\n30\n0.0\n' % (layer, x, y))
+        w('0\nSEQEND\n8\n%s\n' % layer)
+
+    def lines(self, segs, layer):
+        w = self.stream.write
+        for x1, y1, x2, y2 in segs:
+            w('0\nLINE\n8\n%s\n10\n%.4f\n20\n%.4f\n30\n0.0\n11\n%.4f\n21\n%.4f\n31\n0.0\n' % (layer, x1, y1, x2, y2))
+
+    def close(self):
+        self.stream.write('0\nENDSEC\n0\nEOF\n')
+
+
+class hpglWriter(object):
+    # HP-GL for plotters and vinyl cutters: pen 1 cuts, pen 2 scores.
+    # 40 plotter units to the millimetre.
+    PENS = {CUT: 1, SCORE: 2}
+    STEP = 40.0
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.pen = None
+        stream.write('IN;\n')
+
+    def select(self, layer):
+        pen = self.PENS[layer]
+        if pen != self.pen:
+            self.stream.write('SP%d;\n' % pen)
+            self.pen = pen
+
+    def xy(self, x, y):
+        return '%d,%d' % (int(round(x*self.STEP)), int(round(y*self.STEP)))
+
+    def polygon(self, points, layer):
+        if not points:
+            return
+        self.select(layer)
+        coords = [self.xy(x, y) for x, y in points]
+        self.stream.write('PU%s;PD%s,%s;\n' % (coords[0], ','.join(coords[1:]), coords[0]))
+
+    def lines(self, segs, layer):
+        self.select(layer)
+        w = self.stream.write
+        for x1, y1, x2, y2 in segs:
+            w('PU%s;PD%s;\n' % (self.xy(x1, y1), self.xy(x2, y2)))
+
+    def close(self):
+        self.stream.write('PU;SP0;\n')
+
+
+def placements(kit):
+    # (piece, transform) for every piece: where the layout put it, or where it is
+    if kit.layout is None:
+        return [(piece, IDENTITY) for piece in kit.pieces]
+    placed = []
+    for sheet in kit.layout.sheets:
+        shift = (1.0, 0.0, 0.0, 1.0, sheet.origin, 0.0)
+        for piece, transform in sheet.placements:
+            placed.append((piece, compose(shift, transform)))
+    return placed
+
+
+def writekit(writer, kit, geo=None):
+    # Stream the pieces of kit to writer, then close it.  Score lines are dashed with the
+    # piece's dash length (a cutter has no dashed stroke style, so dasharray pieces are
+    # dashed here too).
+    if geo is None:
+        geo = RoofGeometry()
+    placed = placements(kit)
+    # flip y about the kit's bounding box so the lower left corner is at 0,0
+    minx = miny = float('inf')
+    maxy = float('-inf')
+    for piece, transform in placed:
+        a, b, c, d, e, f = transform
+        x0, y0, x1, y1 = piecebox(piece)
+        for x, y in ((x0, y0), (x0, y1), (x1, y0), (x1, y1)):
+            minx = min(minx, a*x + c*y + e)
+            miny = min(miny, b*x + d*y + f)
+            maxy = max(maxy, b*x + d*y + f)
+    for piece, transform in placed:
+        a, b, c, d, e, f = compose((1.0, 0.0, 0.0, -1.0, -minx, maxy), transform)
+        def move(points):
+            return [(a*x + c*y + e, b*x + d*y + f) for x, y in points]
+        if not (piece.hole and piece.insetonly):
+            writer.polygon(move(piece.outline), CUT)
+        if piece.hole:
+            writer.polygon(move(piece.hole), CUT)
+        if piece.scores:
+            dashes = geo.makescores(piece.scores, piece.dashlength).tolist()
+            writer.lines([(a*x1 + c*y1 + e, b*x1 + d*y1 + f, a*x2 + c*y2 + e, b*x2 + d*y2 + f)
+                          for x1, y1, x2, y2 in dashes], SCORE)
+    writer.close()
+
+
+def exportkit(params, path, fmt):
+    # Build the kit for params (extension option names and values) in millimetres,
+    # lay it out on sheets and check it if params asks for that, and write it to path as fmt.
+    # With cache True in params the kit and file text come from, or go to, the kit cache.
+    scale = MM_PER_UNIT[kitoptions(params)['unit']]
+    cache = None
+    if str(params.get('cache', DEFAULTS['cache'])) == 'True':
+        from roof_cache import kitCache
+        cache = kitCache(params.get('cache_dir') or None,
+            int(float(params.get('cache_size', DEFAULTS['cache_size']))*1024*1024))
+        key = cache.key(params, scale, (fmt,))
+        entry = cache.get(key)
+        if entry is not None:
+            with open(path, 'w') as stream:
+                stream.write(entry['output'])
+            return entry['kit']
+    jobs = int(params.get('jobs', DEFAULTS['jobs']))
+    if cache is not None:
+        from roof_cache import cachedgeometry
+        kit = build_roof(params, scale, cachedgeometry(cache), jobs)
+    else:
+        kit = build_roof(params, scale, jobs=jobs)
+    opts = kit.options
+    if opts['layout']:
+        kit.layout = layoutpieces(kit.pieces, opts['sheet_width'], opts['sheet_height'], opts['sheet_margin'],
+            opts['piece_spacing'], opts['layout_rotate'], scale=scale)
+    if opts['validate']:
+        from roof_validate import checkkit
+        kit.collisions = checkkit(kit)
+    writer = {'dxf': dxfWriter, 'hpgl': hpglWriter}[fmt]
+    if cache is None:
+        with open(path, 'w') as stream:
+            writekit(writer(stream), kit)
+        return kit
+    # the cache keeps the text, so it is collected first
+    stream = io.StringIO()
+    writekit(writer(stream), kit)
+    with open(path, 'w') as out:
+        out.write(stream.getvalue())
+    cache.put(key, {'kit': kit, 'output': stream.getvalue()})
+    return kit
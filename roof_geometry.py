@@ -0,0 +1,1793 @@
+#!/usr/bin/env python
+# coding=utf-8
+#
+# Copyright (C) [2021] [Susan Zakar], [sue.zakar@gmail.com]
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# Geometry core for Roof Maker.  Everything here works on plain numbers and
+# point lists; there is nothing from inkex or lxml, so kits can be computed
+# in-process (services, notebooks, batch jobs) without building an SVG document.
+# Roof_Maker.py turns the pieces returned by build_roof() into SVG.
+#
+
+import math
+import os
+import time
+from collections import OrderedDict
+
+
+class lazyNumpy(object):
+    # Stands in for numpy until the geometry first uses it, then puts the real module in
+    # its place.  Options, defaults and the kit cache don't need numpy, and importing it
+    # takes longer than building a small kit.
+    def __getattr__(self, name):
+        global numpy
+        import numpy
+        return getattr(numpy, name)
+
+numpy = lazyNumpy()
+
+# option defaults, shared with Roofmaker.add_arguments
+DEFAULTS = {
+    'unit': 'in',
+    'scoretype': 'dash',
+    'isbarn': 'False',
+    'sides': '12',
+    'basewidth': 1.0,
+    'dormerht': 1.5,
+    'dormertopht': .5,
+    'roof_inset': 1.0,
+    'roofpeak': 2.0,
+    'roofdepth': 3.0,
+    'roofwidth': 7.0,
+    'basecutout': 1.0,
+    'chimney_ht': 45.0,
+    'chimney_wd': 1.0,
+    'chimney_depth': .75,
+    'off_center': .5,
+    'shrink': 0.67,
+    'isabase': 'True',
+    'stickout': 0.0,
+    'paper': 0.01,
+    'window_frame': 0.125,
+    'bhratio': 0.2,
+    'bdratio': 0.4,
+    'tabmode': 'probe',
+    'precision': 4,
+    'relative': 'False',
+    'instances': 'False',
+    'profile': 'False',
+    'profile_file': '',
+    'profile_capture': 'none',
+    'layout': 'False',
+    'sheet_width': 8.5,
+    'sheet_height': 11.0,
+    'sheet_margin': 0.25,
+    'piece_spacing': 0.125,
+    'layout_rotate': 'True',
+    'validate': 'True',
+    'cache': 'False',
+    'cache_dir': '',
+    'cache_size': 256.0,
+    'jobs': 1,
+}
+
+# SVG matrix(a,b,c,d,e,f) that leaves a piece where it is
+IDENTITY = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+class Point(object):
+    # a bare x,y pair; the node builders used to hand around inkex Vector2d objects
+    __slots__ = ('x', 'y')
+    def __init__(self, x=0.0, y=0.0):
+        self.x = x
+        self.y = y
+    def __repr__(self):
+        return 'Point(%r, %r)' % (self.x, self.y)
+
+class pathStruct(object):
+    def __init__(self):
+        self.id="path0000"
+        self.path= []
+        self.enclosed=False
+        self.style = None
+        self.polygon = None
+    def __str__(self):
+        return self.path
+    def prepared(self):
+        # the path as a preparedPolygon, made on first use.
+        # Don't change path after this has been called.
+        if self.polygon is None:
+            self.polygon = preparedPolygon(self.path)
+        return self.polygon
+    
+
+class Piece(object):
+    # One finished piece of the kit, as plain numbers:
+    #   outline - (x,y) nodes of the cut line, tab nodes included, closed back to the first node
+    #   hole    - (x,y) nodes of the inset cutout (empty if there is none)
+    #   scores  - (x1,y1,x2,y2) end points of each score line, before dashing
+    #   tabs    - the tab map (node indices that got a tab on the edge before them)
+    # role is 'struct', 'deco' or 'hole' and decides the fill colour when drawn.
+    def __init__(self, name, role):
+        self.name = name
+        self.role = role
+        self.outline = []
+        self.hole = []
+        self.insetonly = False
+        self.scores = []
+        self.tabs = []
+        self.zerotab = False
+        self.dashlength = 0.0
+        self.dasharray = False
+        self.mkpath = True
+        # for a copy: the Piece it was copied from and the SVG matrix (a,b,c,d,e,f) that places it
+        self.source = None
+        self.transform = IDENTITY
+    def __repr__(self):
+        return 'Piece(%r, %d nodes, %d scores)' % (self.name, len(self.outline), len(self.scores))
+    def copy(self, name, transform=IDENTITY):
+        # Another placement of this piece, without recomputing any of it.  With the
+        # identity transform the node lists are shared; otherwise they are mapped
+        # through the matrix (e.g. (-1,0,0,1,0,0) for a mirror image).
+        dup = Piece(name, self.role)
+        dup.insetonly = self.insetonly
+        dup.tabs = self.tabs
+        dup.zerotab = self.zerotab
+        dup.dashlength = self.dashlength
+        dup.dasharray = self.dasharray
+        dup.mkpath = self.mkpath
+        dup.source = self
+        dup.transform = tuple(transform)
+        if dup.transform == IDENTITY:
+            dup.outline = self.outline
+            dup.hole = self.hole
+            dup.scores = self.scores
+        else:
+            a, b, c, d, e, f = dup.transform
+            dup.outline = [(a*x + c*y + e, b*x + d*y + f) for x, y in self.outline]
+            dup.hole = [(a*x + c*y + e, b*x + d*y + f) for x, y in self.hole]
+            dup.scores = [(a*x1 + c*y1 + e, b*x1 + d*y1 + f, a*x2 + c*y2 + e, b*x2 + d*y2 + f)
+                          for x1, y1, x2, y2 in self.scores]
+        return dup
+
+class Kit(object):
+    # All the pieces for one roof, in drawing order, plus the options (in user units) they came from
+    def __init__(self, options, scale):
+        self.options = options
+        self.scale = scale
+        self.pieces = []
+        self.tabstats = {}
+        self.profilestats = {}
+        self.nodestats = {}  # build graph nodes built and reused, their build times and pieces
+        self.collisions = None  # roof_validate.Collisions, once the kit has been checked
+        self.layout = None  # a roof_layout.Layout once the pieces are put on sheets
+    def __iter__(self):
+        return iter(self.pieces)
+    def __getitem__(self, name):
+        for piece in self.pieces:
+            if piece.name == name:
+                return piece
+        raise KeyError(name)
+
+class pieceModel(object):
+    # The costly parts of a piece, worked out once by RoofGeometry.makemodel:
+    #   nodes     - (x,y) corner nodes, without tabs
+    #   tabs      - edge index -> the two (x,y) tab nodes on that edge.  Edge i runs from
+    #               node i-1 to node i; edge 0 runs from the last node back to the first.
+    #   tabscores - edge index -> the score line under that tab
+    #   scores    - (x1,y1,x2,y2) of the other score lines
+    #   hole      - (x,y) nodes of the inset cutout
+    # piece() puts these together into a Piece.  Variants of the same shape (fewer tabs,
+    # another role, other score lines) come from the same model without refitting anything.
+    def __init__(self):
+        self.nodes = []
+        self.tabs = {}
+        self.tabscores = {}
+        self.scores = []
+        self.hole = []
+        self.insetonly = False
+        self.tabmap = []
+        self.dashlength = 0.0
+        self.dasharray = False
+        self.mkpath = True
+    def scorelines(self, scores, scores2):
+        # score lines between the nodes at scores[k] and scores2[k]
+        nodes = self.nodes
+        return [(nodes[i][0], nodes[i][1], nodes[j][0], nodes[j][1]) for i, j in zip(scores, scores2)]
+    def piece(self, name, role, tabs=None, scores=None, dashlength=None):
+        # tabs is the edges to keep tabs on (default all of them), scores replaces
+        # the other score lines (default the model's) and dashlength the dash length
+        kept = set(self.tabs) if tabs is None else set(tabs) & set(self.tabs)
+        newpiece = Piece(name, role)
+        nodes = self.nodes
+        newpiece.outline.append(nodes[0])  #move to starting node
+        for i in range(1,len(nodes)):  #before moving to each node, check if there should be a tab there and insert it if so
+            if i in kept:
+                newpiece.outline.extend(self.tabs[i])
+                newpiece.scores.append(self.tabscores[i])
+            newpiece.outline.append(nodes[i])  #line to this node
+        #before closing this up, see if we should have a tab between the last node and the first
+        if 0 in kept:
+            newpiece.outline.extend(self.tabs[0])
+            newpiece.scores.append(self.tabscores[0])
+        newpiece.scores.extend(self.scores if scores is None else scores)
+        newpiece.hole = list(self.hole)
+        newpiece.insetonly = self.insetonly
+        newpiece.tabs = [i for i in self.tabmap if i in kept]
+        newpiece.zerotab = 0 in kept
+        newpiece.dashlength = self.dashlength if dashlength is None else dashlength
+        newpiece.dasharray = self.dasharray
+        newpiece.mkpath = self.mkpath
+        return newpiece
+
+class pathWriter(object):
+    # Writes SVG path data straight from numbers into a list of fragments that is
+    # joined once by getvalue(), so nothing has to be parsed back.  Coordinates are
+    # rounded to precision decimals with trailing zeros dropped; with relative=True
+    # the commands are m/l/z and each coordinate is the step from the last (rounded)
+    # point, so rounding errors don't pile up along the path.  A command letter is
+    # only written when it changes (a lineto straight after a moveto needs none) and
+    # no separator is written before a minus sign.
+    def __init__(self, precision=4, relative=False):
+        self.precision = max(0, int(precision))
+        self.relative = relative
+        self.step = 10**self.precision
+        self.buf = []
+        self.cmd = None     # command that following coordinates continue
+        self.cur = (0, 0)   # current point, in steps
+        self.start = (0, 0) # start of this subpath, in steps
+    def num(self, q):
+        # q is in steps of 10**-precision
+        s = '%d' % abs(q)
+        if self.precision:
+            s = s.rjust(self.precision+1, '0')
+            s = (s[:-self.precision] + '.' + s[-self.precision:]).rstrip('0').rstrip('.')
+            if s.startswith('0.'):
+                s = s[1:]
+        if q < 0:
+            s = '-' + s
+        return s
+    def put(self, letter, x, y):
+        q = (int(round(x*self.step)), int(round(y*self.step)))
+        if self.relative:
+            letter = letter.lower()
+            sx, sy = self.num(q[0]-self.cur[0]), self.num(q[1]-self.cur[1])
+        else:
+            sx, sy = self.num(q[0]), self.num(q[1])
+        if letter != self.cmd:
+            self.buf.append(letter)
+        elif sx[0] != '-':
+            self.buf.append(' ')
+        self.buf.append(sx)
+        if sy[0] != '-':
+            self.buf.append(',')
+        self.buf.append(sy)
+        self.cur = q
+        return q
+    def moveto(self, x, y):
+        self.start = self.put('M', x, y)
+        # coordinate pairs after a moveto are taken as linetos
+        self.cmd = 'l' if self.relative else 'L'
+    def lineto(self, x, y):
+        self.put('L', x, y)
+        self.cmd = 'l' if self.relative else 'L'
+    def close(self):
+        self.buf.append('z' if self.relative else 'Z')
+        self.cmd = None
+        self.cur = self.start
+    def polygon(self, points):
+        # a closed subpath through (x,y) points
+        if len(points) == 0:
+            return
+        self.moveto(*points[0])
+        for x, y in points[1:]:
+            self.lineto(x, y)
+        self.close()
+    def segments(self, segs):
+        # a moveto and a lineto for each (x1,y1,x2,y2)
+        for x1, y1, x2, y2 in segs:
+            self.moveto(x1, y1)
+            self.lineto(x2, y2)
+    def __len__(self):
+        return len(self.buf)
+    def getvalue(self):
+        return ''.join(self.buf)
+
+################################ INSET CODE *****
+class preparedPolygon(object):
+    # A closed polygon set up once for point-in-polygon tests: the vertex arrays,
+    # the bounding box and the rise/run of every edge.  contains() answers a whole
+    # batch of points in one NumPy pass with the even-odd crossing test of PNPOLY
+    # (https://github.com/JoJocoder/PNPOLY), bounding box check included.
+    def __init__(self, points):
+        xy = numpy.array([(p.x, p.y) for p in points], dtype=float).reshape(-1, 2)
+        self.x = xy[:,0]
+        self.y = xy[:,1]
+        # edge i runs from vertex i-1 to vertex i
+        self.yj = numpy.roll(self.y, 1)
+        self.dx = numpy.roll(self.x, 1) - self.x
+        self.dy = self.yj - self.y
+        # flat edges never cross the ray; keep them from dividing by zero
+        self.rise = numpy.where(self.dy == 0, 1.0, self.dy)
+        self.minx = self.x.min()
+        self.maxx = self.x.max()
+        self.miny = self.y.min()
+        self.maxy = self.y.max()
+        # shoelace sum; the sign gives the winding of the vertices
+        self.area = 0.5*float(numpy.dot(numpy.roll(self.x, 1), self.y) - numpy.dot(self.yj, self.x))
+    def contains(self, points):
+        # points is a sequence of (x,y); returns an array of True/False
+        pts = numpy.asarray(points, dtype=float).reshape(-1, 2)
+        px = pts[:,0:1]
+        py = pts[:,1:2]
+        crosses = (self.y > py) != (self.yj > py)
+        hits = crosses & (px < self.dx*(py - self.y)/self.rise + self.x)
+        inside = (numpy.count_nonzero(hits, axis=1) % 2) == 1
+        inbox = (pts[:,0] >= self.minx) & (pts[:,0] <= self.maxx) & (pts[:,1] >= self.miny) & (pts[:,1] <= self.maxy)
+        return inside & inbox
+
+class profileCache(object):
+    # Bounded LRU store of dormer top profiles (the topnodescalc nodes), keyed on
+    # (half width, top height, sides) with the lengths rounded to quantum user units.
+    # Live preview and batch runs ask for the same few profiles over and over.
+    # Profiles are (N,2) arrays, made read-only and handed out as they are.
+    def __init__(self, maxsize=128, quantum=1e-6):
+        self.maxsize = maxsize
+        self.quantum = quantum
+        self.profiles = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    def key(self, width, topheight, sides):
+        return (int(round(width/self.quantum)), int(round(topheight/self.quantum)), int(sides))
+    def get(self, width, topheight, sides, compute):
+        # compute(width, topheight, sides) makes the profile on a miss
+        k = self.key(width, topheight, sides)
+        nodes = self.profiles.get(k)
+        if nodes is None:
+            self.misses += 1
+            nodes = numpy.array(compute(width, topheight, sides), dtype=float)
+            nodes.flags.writeable = False
+            self.profiles[k] = nodes
+            if len(self.profiles) > self.maxsize:
+                self.profiles.popitem(last=False)
+                self.evictions += 1
+        else:
+            self.hits += 1
+            self.profiles.move_to_end(k)
+        return nodes
+    def clear(self):
+        self.profiles.clear()
+        self.hits = self.misses = self.evictions = 0
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'size': len(self.profiles), 'maxsize': self.maxsize}
+
+# one cache for the whole process, so separate kits share it
+PROFILES = profileCache()
+
+class nodeCache(object):
+    # Bounded LRU store of node results, keyed on the node name, the values of the
+    # options it reads and the keys of the nodes it needs; so changing one option
+    # only rebuilds the nodes that read it and the ones below them.  Values are
+    # (result, tab counts of building it), so a reused node still counts its tabs.  backing is an
+    # optional second store with get(key) and put(key, value), such as the on-disk
+    # one in roof_cache, that keeps results between runs.
+    def __init__(self, maxsize=64, backing=None):
+        self.maxsize = maxsize
+        self.backing = backing
+        self.results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    def get(self, key):
+        if key in self.results:
+            self.hits += 1
+            self.results.move_to_end(key)
+            return self.results[key]
+        if self.backing is not None:
+            found = self.backing.get(key)
+            if found is not None:
+                self.hits += 1
+                self.keep(key, found)
+                return found
+        self.misses += 1
+        return None
+    def put(self, key, value):
+        self.keep(key, value)
+        if self.backing is not None:
+            self.backing.put(key, value)
+    def keep(self, key, value):
+        if self.maxsize <= 0:
+            return
+        self.results[key] = value
+        if len(self.results) > self.maxsize:
+            self.results.popitem(last=False)
+            self.evictions += 1
+    def clear(self):
+        self.results.clear()
+        self.hits = self.misses = self.evictions = 0
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'size': len(self.results), 'maxsize': self.maxsize}
+
+# one cache for the whole process, like PROFILES
+NODES = nodeCache()
+
+class RoofGeometry(object):
+    # 'probe' places tabs by testing tiny trial tabs against the piece,
+    # 'normal' uses the winding of the piece and the outward normal of each edge
+    tabmode = 'probe'
+    # True to leave score lines whole, for drawing with a stroke-dasharray
+    dasharray = False
+    # where nodesloc looks up dormer top profiles
+    profiles = PROFILES
+    # where build_roof looks up the results of its build graph nodes
+    nodes = NODES
+
+    def __init__(self, *args, **kwargs):
+        super(RoofGeometry, self).__init__(*args, **kwargs)
+        # how many tabs were built, how many had to be made steeper or shorter to fit, and how many never fit
+        self.tabstats = {'tabs': 0, 'adjusted': 0, 'failed': 0}
+
+    def makenode(self, node, opts, got):
+        # build one node of GRAPH; here so a profiler can time each node on its own
+        return node.build(self, opts, got)
+
+    def makescores(self, scores, dashlength):
+        # Dashes for all the score lines of a piece at once.
+        # scores - sequence of (x1,y1,x2,y2) score line end points
+        # Returns an (n,4) array of marks: a dashlength space then a dashlength mark, over
+        # and over, stopping before the last mark would come within one dashlength of the
+        # far end.  With dashlength zero the lines come back whole.
+        segs = numpy.asarray(scores, dtype=float).reshape(-1, 4)
+        if math.isclose(dashlength, 0.0) or len(segs) == 0:
+            return segs.copy()
+        x1, y1, x2, y2 = segs.T
+        # same closeness test as math.isclose
+        horiz = numpy.abs(y1-y2) <= 1e-09*numpy.maximum(numpy.abs(y1), numpy.abs(y2))
+        vert = ~horiz & (numpy.abs(x1-x2) <= 1e-09*numpy.maximum(numpy.abs(x1), numpy.abs(x2)))
+        # start from the end scoreDirection picks
+        first = numpy.where(horiz, x1 < x2, numpy.where(vert, y1 < y2, y1 > y2))
+        sx = numpy.where(first, x1, x2)
+        sy = numpy.where(first, y1, y2)
+        dx = numpy.where(first, x2, x1) - sx
+        dy = numpy.where(first, y2, y1) - sy
+        length = numpy.hypot(dx, dy)
+        count = numpy.floor((length - 3*dashlength)/(2*dashlength)).astype(int) + 1
+        count = numpy.maximum(count, 0)
+        total = int(count.sum())
+        if total == 0:
+            return numpy.zeros((0, 4))
+        line = numpy.repeat(numpy.arange(len(segs)), count)
+        # which mark along its own line each one is
+        k = numpy.arange(total) - numpy.repeat(numpy.cumsum(count) - count, count)
+        ux = dx[line]/length[line]
+        uy = dy[line]/length[line]
+        near = (2*k + 1)*dashlength
+        dashes = numpy.empty((total, 4))
+        dashes[:,0] = sx[line] + ux*near
+        dashes[:,1] = sy[line] + uy*near
+        dashes[:,2] = sx[line] + ux*(near + dashlength)
+        dashes[:,3] = sy[line] + uy*(near + dashlength)
+        return dashes
+
+    def scoreDirection(self, pt1, pt2):
+        # Dashes are laid out from the left end of a horizontal line, the top
+        # of a vertical line and the bottom of a sloped one.
+        # Returns pt1 and pt2 in that order
+        if math.isclose(pt1.y, pt2.y):
+            if pt1.x < pt2.x:
+                return pt1, pt2
+        elif math.isclose(pt1.x, pt2.x):
+            if pt1.y < pt2.y:
+                return pt1, pt2
+        elif pt1.y > pt2.y:
+            return pt1, pt2
+        return pt2, pt1
+
+    def orientTab(self,pt1,pt2,height,angle,theta,orient):
+        tpt1 = Point(0.0,0.0)
+        tpt2 = Point(0.0,0.0)
+        tpt1.x = pt1.x + orient[0]*height + orient[1]*height/math.tan(math.radians(angle))
+        tpt2.x = pt2.x + orient[2]*height + orient[3]*height/math.tan(math.radians(angle))
+        tpt1.y = pt1.y + orient[4]*height + orient[5]*height/math.tan(math.radians(angle))
+        tpt2.y = pt2.y + orient[6]*height + orient[7]*height/math.tan(math.radians(angle))
+        if not math.isclose(theta, 0.0):
+            # rotate each tab point about its own end of the edge
+            ct = math.cos(math.radians(theta))
+            st = math.sin(math.radians(theta))
+            dx = tpt1.x - pt1.x
+            dy = tpt1.y - pt1.y
+            tpt1.x = pt1.x + dx*ct - dy*st
+            tpt1.y = pt1.y + dx*st + dy*ct
+            dx = tpt2.x - pt2.x
+            dy = tpt2.y - pt2.y
+            tpt2.x = pt2.x + dx*ct - dy*st
+            tpt2.y = pt2.y + dx*st + dy*ct
+        return tpt1,tpt2
+
+    def tabOrients(self, pt1, pt2):
+        # Works out which way a tab on the edge pt1-pt2 would be built.
+        # Returns the rotation of the edge from the horizontal, the orientTab
+        # multipliers for our first guess at the outside of the piece, and the
+        # multipliers to use if that guess turns out to be wrong
+        if math.isclose(pt1.x, pt2.x):
+            # It's vertical. Let's try the right side
+            theta = 0.0
+            if pt1.y < pt2.y:
+                guess = [1,0,1,0,0,1,0,-1]
+                other = [-1,0,-1,0,0,1,0,-1]
+            else: # pt2.y < pt1.y
+                guess = [1,0,1,0,0,-1,0,1]
+                other = [-1,0,-1,0,0,-1,0,1]
+        else:
+            if math.isclose(pt1.y, pt2.y):
+                # It's horizontal. Let's try the top
+                theta = 0.0
+            else: # the orientation is neither horizontal nor vertical
+                # Let's get the slope of the line between the points
+                # Because Inkscape's origin is in the upper-left corner,
+                # a positive slope (/) will yield a negative value
+                slope = (pt2.y - pt1.y)/(pt2.x - pt1.x)
+                # Let's get the angle to the horizontal, and construct a horizontal tab
+                theta = math.degrees(math.atan(slope))
+            if pt1.x < pt2.x:
+                guess = [0,1,0,-1,-1,0,-1,0]
+                other = [0,1,0,-1,1,0,1,0]
+            else: # pt2.x < pt1.x
+                guess = [0,-1,0,1,-1,0,-1,0]
+                other = [0,-1,0,1,1,0,1,0]
+        return theta, guess, other
+
+    def tabsides(self, tpath, edges, tabht):
+        # For each (pt1, pt2) edge in edges, find out whether the first guess from
+        # tabOrients puts the tab on the wrong side of the piece.  A tiny probe tab
+        # is built on every edge and all the probe points are tested against the
+        # piece in one go.  Returns a list of True (guessed wrong) / False.
+        testAngle = 1.0
+        testHt = tabht * 0.001
+        probes = []
+        for pt1, pt2 in edges:
+            theta, guess, other = self.tabOrients(pt1, pt2)
+            pnpt1,pnpt2 = self.orientTab(pt1,pt2,testHt,testAngle,theta,guess)
+            probes.append((pnpt1.x, pnpt1.y))
+            probes.append((pnpt2.x, pnpt2.y))
+        if not probes:
+            return []
+        inside = tpath.prepared().contains(probes)
+        flips = []
+        for k in range(len(edges)):
+            in1 = inside[2*k]
+            in2 = inside[2*k+1]
+            flips.append(bool(((not tpath.enclosed) and (in1 or in2)) or \
+                              (tpath.enclosed and ((not in1) and (not in2)))))
+        return flips
+
+    def tabNormal(self, tpath, pt1, pt2):
+        # Unit vector at right angles to the edge pt1-pt2 pointing to the side the
+        # tab belongs on (away from the piece, or into it for an enclosed path).
+        # pt1 is the later node of the edge as the piece is walked, so with a
+        # positive winding the outside is on the left of pt1->pt2.
+        # Returns None for a zero-length edge.
+        ex = pt2.x - pt1.x
+        ey = pt2.y - pt1.y
+        seglength = math.sqrt(ex**2 + ey**2)
+        if seglength == 0:
+            return None
+        side = 1.0 if tpath.prepared().area > 0 else -1.0
+        if tpath.enclosed:
+            side = -side
+        return -side*ey/seglength, side*ex/seglength
+
+    def tabPoints(self, pt1, pt2, height, angle, normal):
+        # The two outer tab points for the edge pt1-pt2: out along normal by height,
+        # and in from each end along the edge by height/tan(angle)
+        ex = pt2.x - pt1.x
+        ey = pt2.y - pt1.y
+        seglength = math.sqrt(ex**2 + ey**2)
+        inset = height/math.tan(math.radians(angle))/seglength
+        tpt1 = Point(pt1.x + normal[0]*height + ex*inset, pt1.y + normal[1]*height + ey*inset)
+        tpt2 = Point(pt2.x + normal[0]*height - ex*inset, pt2.y + normal[1]*height - ey*inset)
+        return tpt1,tpt2
+
+    def tabFits(self, seglength, height, angle):
+        # True if the two sides of a tab on an edge seglength long don't cross.
+        # The sides meet seglength/2 along the edge at a height of seglength/2*tan(angle),
+        # so this is the same answer as intersecting the sides of the finished tab.
+        if angle >= 90.0:
+            return True
+        return height < seglength/2*math.tan(math.radians(angle))
+
+    def fitTab(self, seglength, tabht, taba):
+        # Works out the tab height and angle for an edge seglength long, without building trial tabs.
+        # Steeper sides are tried first (whole degrees up to 88), then shorter tabs (20% steps)
+        # at the original angle.  This is not the largest tab that fits: it is the answer the old
+        # trial-and-error loop reached, worked out in closed form so that kits come out as they
+        # always have.  The angle can be up to 1 degree steeper than the least that fits
+        # (atan2(2*tabht, seglength)), and a shortened tab up to 20% of tabht shorter than the
+        # tallest that fits at taba (seglength/2*tan(taba)).
+        # Returns height, angle and 0 if the tab fits as asked, 1 if it had to be adjusted,
+        # or 2 if nothing fits (the smallest tab is returned to show the failure).
+        if tabht <= 0.0 or self.tabFits(seglength, tabht, taba):
+            return tabht, taba, 0
+        maxAngle = 88.0 # We're not increasing the tab angle above 89 degrees
+        # the sides just meet at the top of the tab at this angle
+        needAngle = math.degrees(math.atan2(2*tabht, seglength))
+        currTabAngle = taba + max(1, math.floor(needAngle - taba) + 1)
+        if (currTabAngle <= maxAngle) and not self.tabFits(seglength, tabht, currTabAngle):
+            currTabAngle = currTabAngle + 1.0 # rounding put us right on the limit
+        if currTabAngle <= maxAngle:
+            return tabht, currTabAngle, 1
+        # So, reduce the tab height in 20% steps instead
+        step = tabht*0.2
+        limit = seglength/2*math.tan(math.radians(taba))
+        steps = max(1, math.floor((tabht - limit)/step) + 1)
+        if steps < 5 and not self.tabFits(seglength, tabht - steps*step, taba):
+            steps = steps + 1
+        if steps < 5:
+            return tabht - steps*step, taba, 1
+        # Give up
+        return tabht - 4*step, taba, 2
+
+    def makeTab(self, tpath, pt1, pt2, tabht, taba, flip=None):
+        # tpath - the pathstructure containing pt1 and pt2
+        # pt1, pt2 - the two points where the tab will be inserted
+        # tabht - the height of the tab
+        # taba - the angle of the tab sides
+        # flip - result of tabsides for this edge, if already known
+        # returns the two tab points (Point objects) in order of closest to pt1
+        # Let's find out the orientation of the tab
+        normal = None
+        if self.tabmode == 'normal':
+            normal = self.tabNormal(tpath, pt1, pt2)
+        if normal is None:
+            theta, guess, other = self.tabOrients(pt1, pt2)
+            if flip is None:
+                flip = self.tabsides(tpath, [(pt1, pt2)], tabht)[0]
+            if flip:
+                orient = other # Guessed wrong
+            else:
+                orient = guess # Guessed right
+        # Make sure the sides of the tab won't cross each other
+        seglength = math.sqrt((pt1.x-pt2.x)**2 +(pt1.y-pt2.y)**2)
+        currTabHt, currTabAngle, adjustTab = self.fitTab(seglength, tabht, taba)
+        self.tabstats['tabs'] += 1
+        if adjustTab == 1:
+            self.tabstats['adjusted'] += 1
+        elif adjustTab == 2:
+            self.tabstats['failed'] += 1
+        if normal is None:
+            tpt1,tpt2 = self.orientTab(pt1,pt2,currTabHt,currTabAngle,theta,orient)
+        else:
+            tpt1,tpt2 = self.tabPoints(pt1,pt2,currTabHt,currTabAngle,normal)
+        return tpt1,tpt2
+
+    def insetPolygon(self, points, insetDist):
+
+            # Converted from
+            # public-domain code by Darel Rex Finley, 2007
+            # See diagrams at http://alienryderflex.com/polygon_inset
+
+            # points = clockwise (x,y) corners, not closed
+            # insetDist = positive inset distance
+            # NOTE: To outset the polygon, provide CCW corners or negative insetDist (not both)
+            # Returns a new list of (x,y); points is left as it is
+            inset = [(x, y) for x, y in points]
+            corners = len(inset)
+            # Polygon must have at least three corners to be inset
+            if corners < 3:
+                return inset
+            startX, startY = inset[0]
+            # Inset the polygon
+            c, d = inset[corners-1]
+            e, f = inset[0]
+            for i in range(corners-1):
+                a = c #last x
+                b = d #last y
+                c = e #first x
+                d = f #first y
+                e, f = inset[i+1] #following x and y
+                #status, px, py = self.insetCorner(a,b,c,d,e,f,insetDist)
+                status, px, py = self.insetCorner(a,b,c,d,e,f,insetDist)
+                if status == 1:
+                    inset[i] = (px, py)
+                
+            #status, px, py = self.insetCorner(c,d,e,f,startX,startY,insetDist)
+            status, px, py = self.insetCorner(c,d,e,f,startX,startY,insetDist)
+            if status == 1:
+                inset[-1] = (px, py)
+            return inset
+                
+    def insetCorner(self, a,b,c,d,e,f,insetDist):
+        # Converted from
+        # public-domain code by Darel Rex Finley, 2007
+        # Given the sequentially connected points (a,b), (c,d), and (e,f), this
+        # function returns, in (C,D), a bevel-inset replacement for point (c,d).
+
+        # Note:  If vectors (a,b)->(c,d) and (c,d)->(e,f) are exactly 180° opposed,
+        #         or if either segment is zero-length, this function will do
+        #         nothing; i.e. point (C,D) will not be set.
+
+        c1 = c #first x
+        d1 = d #first y
+        c2 = c #first x
+        d2 = d #first y
+        # Calculate length of line segments
+        dx1 = c - a  #first x  - last x
+        dy1 = d - b  #first y - last y
+        dist1 = math.sqrt(dx1**2 + dy1**2) #diagonal of the distance
+        dx2 = e - c #the following x - the first x
+        dy2 = f - d #the following y - the first y
+        dist2 = math.sqrt(dx2**2 + dy2**2)  #diagnonal of those
+        # Exit if either segment is zero-length
+        if math.isclose(dist1, 0.0,abs_tol=1e-09) or math.isclose(dist2, 0.0,abs_tol=1e-09):
+            return 0,0,0
+        # Inset each of the two line segments
+        insetX = dy1/dist1*insetDist
+        a += insetX
+        c1 += insetX
+        insetY = -dx1/dist1*insetDist
+        b += insetY
+        d1 += insetY
+        insetX = dy2/dist2*insetDist
+        e += insetX
+        c2 += insetX
+        insetY = -dx2/dist2*insetDist
+        f += insetY
+        d2 += insetY
+        # If inset segments connect perfectly, return the connection point
+        if math.isclose(c1, c2) and math.isclose(d1, d2,abs_tol=1e-09):
+            return 1, c1, d1
+        # Return the intersection point of the two inset segments (if any)
+        #status, inX, inY = self.lineIntersection(a,b,c1,d1,c2,d2,e,f)
+        status, inX, inY = self.lineIntersection(a,b,c1,d1,c2,d2,e,f)
+        if status == 1:
+            insetX = inX
+            insetY = inY
+            return 1, insetX, insetY
+
+    def lineIntersection(self, Ax,Ay,Bx,By,Cx,Cy,Dx,Dy):
+        # Converted from
+        # public domain function by Darel Rex Finley, 2006
+
+        # Determines the intersection point of the line defined by points A and B with the
+        # line defined by points C and D.
+
+        # Returns 1 if the intersection point was found, and returns that point in X,Y.
+        # Returns 0 if there is no determinable intersection point, in which case X,Y will
+        #be unmodified.
+
+        # Fail if either line is undefined
+        if (math.isclose(Ax, Bx) and math.isclose(Ay, By)) or (math.isclose(Cx, Dx) and math.isclose(Cy, Dy)):
+            return 0, 0, 0
+        # (1) Translate the system so that point A is on the origin
+        Bx -= Ax
+        By -= Ay
+        Cx -= Ax
+        Cy -= Ay
+        Dx -= Ax
+        Dy -= Ay
+        # Discover the length of segment A-B
+        distAB = math.sqrt(Bx**2 + By**2)
+        # (2) Rotate the system so that point B is on the positive X axis
+        theCos = Bx/distAB
+        theSin = By/distAB
+        newX = Cx*theCos + Cy*theSin
+        Cy = Cy*theCos - Cx*theSin
+        Cx = newX
+        newX = Dx*theCos + Dy*theSin
+        Dy = Dy*theCos - Dx*theSin
+        Dx = newX
+        # Fail if the lines are parallel
+        if math.isclose(Cy, Dy):
+            return 0,0,0
+        # (3) Discover the position of the intersection point along line A-B
+        ABpos = Dx + (Cx - Dx)*Dy/(Dy - Cy)
+        # (4) Apply the discovered position to line A-B in the original coordinate system
+        X = Ax + ABpos*theCos
+        Y = Ay + ABpos*theSin
+        return 1, X, Y
+
+    ###############################
+
+
+   
+
+    def makepiece(self,list1,scores,scores2,tscoremap,zerotab,cutout,cutoutpath,piece,role,tab_height,dashlength,tab_angle,mkpath,inset_only,isabase):
+        # Works out the outline (with tabs), the inset cutout and the score lines for one piece
+        # and returns them as a Piece.  Roof_Maker.stringmeup turns the Piece into SVG.
+        model = self.makemodel(list1,scores,scores2,tscoremap,zerotab,cutout,cutoutpath,tab_height,dashlength,tab_angle,mkpath,inset_only)
+        return model.piece(piece, role)
+
+    def makemodel(self,list1,scores,scores2,tscoremap,zerotab,cutout,cutoutpath,tab_height,dashlength,tab_angle,mkpath,inset_only):
+        # Does the work for a piece (inset cutout, tab fitting, score lines) once and keeps
+        # it in a pieceModel, which can then hand out the piece and its variants.
+        # list1 and cutoutpath are (N,2) node arrays and are left as they are.
+        plist = pathStruct()
+        model = pieceModel()
+        list1 = numpy.asarray(list1, dtype=float)
+        #if there is not a base then we are missing the last point.
+        
+        if not( math.isclose(cutout,0)): # we have a cutout path
+            cutoutpath = numpy.asarray(cutoutpath, dtype=float)
+            #for the cutout, if the first and last are NOT the same, then add an ending node so insetPolygon works as expected
+            jj = math.isclose(cutoutpath[0,0],cutoutpath[-1,0])
+            jk = math.isclose(cutoutpath[0,1],cutoutpath[-1,1])
+            if  not(jk and jj):
+                cutoutpath = numpy.vstack((cutoutpath, cutoutpath[:1]))
+        #but if our list has the same first and last elements, leave out the last element
+        jj = math.isclose(list1[0,0],list1[-1,0])
+        jk = math.isclose(list1[0,1],list1[-1,1])
+        if (jj and jk):
+            list1 = list1[:-1]
+        
+        model.nodes = [tuple(node) for node in list1.tolist()]
+        #makeTab and tabsides work on Points; nothing changes them
+        plist.path = [Point(x, y) for x, y in model.nodes]
+        list1 = plist.path
+        
+        if (cutout != 0):  #here we handle second path which is inset and will be added to path
+            hole = self.insetPolygon(cutoutpath[0:-1].tolist(),cutout)
+            
+            #the hole runs the other way round from the outline
+            model.hole = hole[:1] + hole[:0:-1]
+            model.insetonly = inset_only
+            
+        #find out which side every tab goes on before building any of them
+        tabedges = [(list1[i], list1[i-1]) for i in range(1,len(list1)) if i in tscoremap]
+        if zerotab:
+            tabedges.append((list1[0], list1[len(list1)-1]))
+        if self.tabmode == 'normal':
+            flips = [None]*len(tabedges)
+        else:
+            flips = self.tabsides(plist, tabedges, tab_height)
+        
+        #build the tab for every tabbed edge; edge i ends at node i
+        for i in range(1,len(list1)):
+            if i in tscoremap:                
+                tabpt2, tabpt1 = self.makeTab(plist, list1[i], list1[i-1], tab_height, tab_angle, flips.pop(0))
+                model.tabs[i] = ((tabpt1.x, tabpt1.y), (tabpt2.x, tabpt2.y))
+                model.tabscores[i] = model.nodes[i] + model.nodes[i-1]  #the tab will join to the one before it
+            
+        #and the one between the last node and the first, which is edge 0
+        if zerotab:  
+            
+            zt= len(list1)-1 # the last point on the list
+                     
+            tabpt2, tabpt1 = self.makeTab(plist,list1[0], list1[zt], tab_height,tab_angle,flips.pop(0)) 
+            model.tabs[0] = ((tabpt1.x, tabpt1.y), (tabpt2.x, tabpt2.y))
+            model.tabscores[0] = model.nodes[0] + model.nodes[zt]
+        
+        model.scores = model.scorelines(scores, scores2)
+        model.tabmap = list(tscoremap)
+        model.dashlength = dashlength
+        model.dasharray = self.dasharray
+        model.mkpath = mkpath
+        return model
+
+    #function to return the xy values for the top of the dormer.
+    #when changing to inkscape we will need to call these with self.
+
+    def geo_b_alpha_a(self,b, alpha):
+        c= b/math.cos(math.radians(alpha))
+        a = math.sqrt(c**2-b**2)
+        return a
+    
+    def geo_b_alpha_c(self,b, alpha):
+        c=b/math.cos(math.radians(alpha))
+        return c
+
+    def geo_a_b_alpha(self,a,b):
+        c=math.sqrt(a**2+b**2)
+        alpha = math.asin(a/c)
+        return math.degrees(alpha)
+
+    def geo_a_b_c(self,a,b):
+        c=math.sqrt(a**2+b**2)
+        return c
+
+    def geo_c_a_b(self,c,a):
+        b= math.sqrt(c**2 - a**2)
+        return b
+        
+    def geo_a_alpha_b(self,a, alpha):
+        c=a/math.sin(math.radians(alpha))
+        b= math.sqrt(c**2 - a**2)
+        return b
+        
+    def geo_c_alpha_b(self,c,alpha):
+        a = c * math.sin(math.radians(alpha))
+        b = math.sqrt(c**2 - a**2)
+        return(b)   
+    def geo_c_alpha_a(self,c,alpha):
+        a= c * math.sin(math.radians(alpha))
+        return(a)
+    def circleCalc(self,b, c, d):
+        temp = c[0]**2 + c[1]**2
+        bc = (b[0]**2 + b[1]**2 - temp) / 2
+        cd = (temp - d[0]**2 - d[1]**2) / 2
+        det = (b[0] - c[0]) * (c[1] - d[1]) - (c[0] - d[0]) * (b[1] - c[1])
+
+        if abs(det) < 1.0e-10:
+            return None
+
+        # Center of circle
+        cx = (bc*(c[1] - d[1]) - cd*(b[1] - c[1])) / det
+        cy = ((b[0] - c[0]) * cd - (c[0] - d[0]) * bc) / det
+
+        radius = ((cx - b[0])**2 + (cy - b[1])**2)**.5
+
+        return cx,cy,radius
+        
+
+
+    def intersectionPoints(self,a,b,origin,pt1,pt2):
+        #Credit to yashjain12yj from post on stackoverflow
+        #xi1, yi1, xi2, yi2 <- intersection points
+        x1=pt1.x
+        x2 = pt2.x
+        y1 = pt2.y
+        y2 = pt2.y
+        h=origin.x
+        k=origin.y
+        xi1, yi1, xi2, yi2, aa, bb, cc, m = 0, 0, 0, 0, 0, 0, 0, 0
+        if x1 != x2:
+            m = (y2 - y1)/(x2 - x1)
+            c = y1 - m * x1
+            aa = b * b + a * a * m * m
+            bb = 2 * a * a * c * m - 2 * a * a * k * m - 2 * h * b * b
+            cc = b * b * h * h + a * a * c * c - 2 * a * a * k * c + a * a * k * k - a * a * b * b
+        else:
+            # vertical line case
+            aa = a * a
+            bb = -2.0 * k * a * a
+            cc = -a * a * b * b + b * b * (x1 - h) * (x1 - h)
+        d = bb * bb - 4 * aa * cc
+        # intersection points : (xi1,yi1) and (xi2,yi2)
+        if d > 0:
+            if (x1 != x2):
+                xi1 = (-bb + (d**0.5)) / (2 * aa)
+                xi2 = (-bb - (d**0.5)) / (2 * aa)
+                yi1 = y1 + m * (xi1 - x1)
+                yi2 = y1 + m * (xi2 - x1)
+            else:
+                yi1 = (-bb + (d**0.5)) / (2 * aa)
+                yi2 = (-bb - (d**0.5)) / (2 * aa)
+                xi1 = x1
+                xi2 = x1
+        return (Point(xi1, yi1),Point(xi2, yi2))
+
+    def ellipseg(self,a,b,segs,tol=1e-9):  #calculate the node endpoints for segments of equal arc length in ellipse x+ y- quadrant
+        # The quadrant runs from (0,-b) to (a,0) as x = a*sin(t), y = -b*cos(t) for t in [0,pi/2].
+        # Arc length is integrated with composite 8 point Gauss-Legendre, doubling the panels
+        # until the total settles to tol (relative), and the split points are found together
+        # with Newton's method on s(t) = target.  With an odd number of segments the first
+        # piece is half a segment, as before.
+        odd = (segs%2)!=0
+        seg2 = segs/2
+        gx, gw = numpy.polynomial.legendre.leggauss(8)
+        def speed(t):
+            return numpy.hypot(a*numpy.cos(t), b*numpy.sin(t))
+        def panels(m):
+            # arc length of each of m equal panels
+            h = (math.pi/2)/m
+            t = (numpy.arange(m)[:,None] + (gx+1)/2)*h
+            return speed(t).dot(gw)*(h/2)
+        m = 4
+        plen = panels(m)
+        while m < 4096:
+            plen2 = panels(2*m)
+            done = abs(plen2.sum() - plen.sum()) <= tol*plen2.sum()
+            m, plen = 2*m, plen2
+            if done:
+                break
+        h = (math.pi/2)/m
+        cum = numpy.concatenate(([0.0], numpy.cumsum(plen)))
+        lenfull = cum[-1]
+
+        segpiece = lenfull/seg2  #this is the length of a full segment
+        if odd:
+            targets = segpiece/2 + segpiece*numpy.arange((segs-1)//2)
+        else:
+            targets = segpiece*numpy.arange(1, segs//2)
+        if len(targets) and lenfull > 0:
+            t = numpy.interp(targets, cum, h*numpy.arange(m+1))
+            for k in range(50):
+                j = numpy.minimum((t/h).astype(int), m-1)
+                t0 = j*h
+                # length up to t: whole panels plus the part of panel j below t
+                part = speed(t0[:,None] + (gx+1)/2*(t-t0)[:,None]).dot(gw)*((t-t0)/2)
+                err = cum[j] + part - targets
+                t = numpy.clip(t - err/speed(t), 0.0, math.pi/2)
+                if numpy.abs(err).max() <= tol*lenfull:
+                    break
+            inner = numpy.column_stack((a*numpy.sin(t), -b*numpy.cos(t)))
+        else:
+            inner = numpy.tile((0.0, -b), (len(targets), 1))
+        #the (x,y) nodes as an (N,2) array
+        return numpy.vstack(([(0.0, -b)], inner, [(a, 0.0)]))
+            
+    def topnodescalc(self,axisx,axisy,sidect):
+        #SIDE NODE CALCUATION FOR DORMER TOP
+        #set these variables to appropriate values in the extension
+        
+        #-----------------
+        axisy2=axisy
+        odd = ( sidect % 2 != 0)
+        pass1 = self.ellipseg(axisx,axisy,sidect)
+
+        if (odd):  #need to do second pass which is taller than first then omit the topmost point and join the next topmost
+            #there is a fudge factor here.  Instead of using the y value for those two points, we use the requested height
+
+            eplus = pass1[1,1] - pass1[0,1]
+            axisy += eplus  
+            pass1 = self.ellipseg(axisx,axisy,sidect)
+            
+            #drop the first two nodes, because we replace these
+            pt1 = Point(-axisx -10, -axisy2)
+            pt2 = Point(axisx +10, -axisy2)
+            origin = Point(0,0)
+            ppt1,ppt2 = self.intersectionPoints(axisx,axisy,origin,pt1,pt2)
+            pass1 = numpy.vstack(([(ppt1.x, ppt1.y)], pass1[2:]))
+
+        #reverse for other side of dormer top
+        if odd:
+            rs =0
+        else:
+            rs =1
+        mirror = pass1[rs:][::-1]*(-1.0, 1.0)
+        return numpy.vstack((mirror, pass1))
+
+    def nodesloc (self,fwidth,baseht,topheight,segnum,isabase,notop):  #in this revision also construct the lenlist at same time
+        #use self.topnodes to get the nodes along the top.  The bottom center of the top will be a 0,0
+        #returns the (x,y) nodes of the dormer front as an (N,2) array and the N-1 edge lengths
+        width = fwidth/2
+
+        if notop:
+            #just make the base 
+            nodes = numpy.array([(width,baseht),(-width,baseht),(-width,0.0),(width,0.0),(width,baseht)])
+            lenlist = numpy.array([2*width,baseht,2*width,baseht])
+        else:
+            nodes = self.profiles.get(width,topheight,segnum,self.topnodescalc)
+           #if we have a base (with a top), insert it here  -- start lower right and draw bottom segment
+            if isabase:
+                nodes = numpy.vstack(([(width,baseht),(-width,baseht)], nodes))
+            d = numpy.diff(nodes, axis=0)
+            lenlist = numpy.sqrt(d[:,0]**2 + d[:,1]**2)
+        return nodes,lenlist
+        
+
+    def outsets (self,ylist,lenlist,isabase,baseht,stickout,roofangle):  #how far will our dormer nodes be from the roof?
+        
+        outsetlen = []
+        #In order to calculate this as we like, for purposes of calculation, either the bottom of the base will be at zero or if no base then the bottom of the dormer top. 
+        #in addition if there is a stickout, then we need to figure that in as well on our x values
+        y2 = ylist[0]  #bottommost
+        
+        
+        stopy = math.floor(len(ylist)/2)+1
+        rpty =  int(len(ylist)%2 == 1) 
+        
+        for i in range(1,stopy): 
+            y2 = y2 - ylist[i]  #moving upward 
+            
+            #calculate the hypotenuse given alpha=roofangle and a=totht
+            oa =( self.geo_b_alpha_a(y2,90-roofangle))
+            outsetlen.append = oa
+            
+            
+        #we have half the outsets. To get the rest, reverse the list
+        ii = len(outsetlen)
+        for i in reversed(range(ii-rpty)):
+            outsetlen.append(outsetlen[i])
+        
+        
+        return outsetlen  #contains the outsets for the points in the top     
+        
+    def sidenodes(self,lenlist,nodes,isabase,roofangle,baseht,stickout,sides,notop,width):
+        #lenlist and nodes are from nodesloc; the side path comes back as an (N,2) array
+        
+        totht = 0   
+        scount =0
+        if math.isclose(stickout,0,abs_tol=1e-09):
+            isstickout = False
+            stickout = 0.0
+        else:
+            isstickout = True
+        if notop:  #just do the four points since the base is always a rectangle
+            x2 = self.geo_b_alpha_a(baseht,90-roofangle)
+            yy = [0,baseht,baseht+width,(2*baseht)+width]
+            xx = [0,x2,x2,0]
+            if isstickout:
+                xx1 = -stickout
+                xx.append(-stickout)
+                yy.append((2*baseht)+width)
+            else:
+                xx1 = 0
+            yydown = [baseht+width,baseht,0]  
+            xxdown = [xx1,xx1,xx1]
+            tadd=0
+            if isstickout:
+                tadd = 1
+                xxdown.append(0)
+                yydown.append(0)
+            xx.extend(xxdown)
+            yy.extend(yydown)
+            spathlist = numpy.column_stack((xx, yy)).astype(float)
+            tmap = [1,2,3]
+            
+            smap = [1,2]
+            smapr = [5+tadd,4+tadd]
+            decosmap = list(smap)
+            decosmapr = list(smapr)
+        else:
+            
+            ylist = nodes[:,1]
+            lenlist = numpy.concatenate(([0.0], lenlist))
+            
+            if isabase:
+                #first point will be 0,baseht
+                #drop the first two y values so it corresponds
+                ylist = numpy.concatenate(([baseht], ylist[2:], [baseht]))
+                #and the length of the bottom edge
+                lenlist = numpy.concatenate((lenlist[:1], lenlist[2:], [baseht]))
+                
+
+            #roof angle is base_angle.
+
+            xzero = stickout #if base sticks out, the left side will be adjusted accordingly
+            smap = []
+            smapr = []
+            decosmap=[]
+            decosmapr=[]
+            tmap = []    
+            totht = 0
+            if sides%2 == 0:
+                even = 1
+            else:
+                even = 0
+
+            y1vtot = 0
+            if not(isabase):
+                ylist = numpy.append(ylist, ylist[0])
+            else:
+                y1vtot = baseht
+            #find the y axis values, subtracting the lengths one at a time as we go up
+            y1v = numpy.subtract.accumulate(numpy.concatenate(([y1vtot], lenlist)))[1:]
+                
+            #find the x axis values
+            #lenlist has values for the top of the dormer only.  If therere is a base, we handle it separately.
+            #each is geo_b_alpha_a(x2,90-roofangle) for x2 the height above the base
+            if isabase:
+                b=0
+            else:
+                b=1
+            x2 = numpy.abs(ylist[1:len(ylist)-b] - baseht)
+            c = x2/math.cos(math.radians(90-roofangle))
+            x1v = numpy.concatenate(([0.0], numpy.sqrt(c**2 - x2**2)))
+            right = numpy.column_stack((x1v, y1v[:len(x1v)]))
+
+            #finally just traverse back down the left side 
+            xout =0
+            left = []
+            if (isstickout):
+                left.append((-stickout,y1v[-1]))
+                xout = -stickout
+            down = numpy.column_stack((numpy.full(len(y1v)-1, float(xout)), y1v[-2::-1]))
+            tail = [(0.0,y1v[0])] if isstickout else []
+            spathlist = numpy.vstack([right] + [numpy.array(part).reshape(-1,2) for part in (left, down, tail)])
+                
+                
+            #and tabs only on right side
+            if isabase: 
+                bm = 2
+                ij = 0
+            else:
+                bm=0
+                ij = 1
+            for i in range((sides+bm)):  
+                tmap.append(i+1)
+                
+                
+                         
+                
+                
+                
+                
+            #we now have the perimeter of the side piece (UNCLOSED)  Now need to map out the scorelines and tabs
+            #for now just put scorelines only at the top and bottom parts and at the middle
+            # if sides is odd then there won't be a top point and we need scorelines in two points across the middle
+            # if sides is even then we have a score line at the top only
+            # we have tabs only along the right side (the part that will fit into the hole in the roof
+            # SCORE MARKS
+            
+            cj = 1
+            if (isstickout): #if we have a stickout
+                cj = 2
+            
+            z = math.floor(len(spathlist)/2)
+            for i in range(1,z):
+                        q = (len(spathlist)-cj )-i
+                        
+                        smap.append(i)
+                        smapr.append(q)
+            bout=0 
+            sout = 0
+            #now put scorelines on the deco.
+            if isstickout:
+                sout = 1
+            if isabase:
+                bout = 1
+            #if even math.floor((len(spathlist)+sout)/4)
+            #if odd math.floor((len(spathlist)+sout)/4) and previous one
+            
+            za = math.floor(sides/2) 
+            
+            if isabase:
+                za = za+1
+            if even:
+                q = 3*za
+                if isstickout:
+                    q= q+1
+                decosmap.append(za)
+                decosmapr.append(q)
+                                        
+            else:
+                if isstickout:
+                    sk =1
+                else:
+                    sk=0
+                z1 = za+1
+                q = (3*za)+2+sk
+                q1 = q-1
+                decosmap.append(za)
+                decosmap.append(z1)
+                decosmapr.append(q)
+                decosmapr.append(q1)
+           
+        return spathlist,smap,smapr,tmap,decosmap,decosmapr   #the function returns a path list for the side, a scoremap, a reverse score map and a tab map.     
+            
+    def holenodes(self,nodes, baseht, basewd,roofangle,isabase):  #plot the hole part
+        #increase the hole size just a bit to accommodate paper thickness.
+        #since the nodes have the values for the shape, we do not need to account for the base separately.
+        #except for where we begin and end
+        #calculate stretched y: geo_b_alpha_c(oldy,90-roofangle) of the height above the base
+        oldy = baseht+(-nodes[:,1])
+        newy = oldy/math.cos(math.radians(90-roofangle))-baseht
+        hpathlist = numpy.column_stack((nodes[:,0], numpy.where(oldy == 0, nodes[:,1], -newy)))
+        #closed, back at the first node
+        return numpy.vstack((hpathlist, hpathlist[:1]))
+
+       
+
+    def frontnodes(self,nodes,stickout,width,baseht,notop):
+        #we already have our front nodes.  They are the nodes from nodesloc
+        #so just put them into fpathlist and make a tab and score list
+        # the only addition here is that if we have a "stickout" then we are going to add in a bottom piece that extends downward a distance of stickout and is the width of the dormer. 
+        
+        if math.isclose(baseht,0,abs_tol=1e-09):
+            isabase = False
+        else:
+            isabase = True
+        tmap = []
+        smap = []
+        smapr = []
+        if notop:
+            nodes = numpy.array([(width/2,baseht),(-width/2,baseht),(-width/2,0.0),(width/2,0.0)])
+        
+        fpathlist = nodes
+        fshortlist = numpy.vstack((nodes, nodes[:1]))   #used for cutout, closed
+        if stickout>0:
+            flap = [(width/2,baseht+stickout),(-width/2,baseht+stickout)]
+            if isabase:
+                fpathlist = numpy.vstack((nodes[:1], flap, nodes[1:]))
+                smap.append(0)
+                smapr.append(3)  #need a scoreline to fold stickout under
+            else:
+                fpathlist = numpy.vstack((flap, nodes))
+                smap.append(len(fpathlist)-1)
+                smapr.append(2)  #need a scoreline to fold stickout under
+            
+
+        
+
+        #need to set up the tabs -- basically tabs on all the segment edges 
+        for i in range(1,len(fpathlist)):
+            ck = 1
+            tmap.append(i)
+        #see what is in these paths
+    
+
+    
+        return fpathlist,fshortlist,smap,smapr,tmap
+
+    def roofsidenodes(self,halfdepth,side_inset_ht,bbx,bty,roofpeak,isbarn):
+        #btx = bdratio*halfdepth  
+        #bty = roofpeak*bhratio  
+        #bbx = halfdepth - btx           
+        #bby = roofpeak-bty   
+        #fixed 12-31-2021
+        smap = []
+        smapr = []
+        if  not isbarn: # not a barn
+            rsidepathlist = [(0,0), #0
+                             (halfdepth,side_inset_ht), #1
+                             (-halfdepth,side_inset_ht), #2
+                             (0,0)] #3
+            tmap = [1,2]
+            smap =[]
+            smapr = []
+            
+        else: #is a barn
+            rsidepathlist = [(0,0), #0
+                             (bbx,bty), #1
+                             (halfdepth,roofpeak), #2
+                             (-halfdepth,roofpeak), #3
+                             (-bbx,bty), #4
+                             (0,0)] #5 back to origin
+            tmap = [1,2,3,4,5]
+            
+            #smap =[1]
+            #smapr = [4]
+        
+        return numpy.array(rsidepathlist, dtype=float),smap,smapr,tmap
+
+    def roofmainnodes(self,roof_inset,roof_top_width,roofwidth,roof_actual_ht,bbx,bby,btx,bty,bb_ln,bt_ln,isbarn):
+        smap=[]
+        smapr=[]
+        tmap = []
+        if not(isbarn):
+            rpathlist = [(roof_inset,0), #0
+                         (roof_inset+roof_top_width,0), #1
+                         (roofwidth,roof_actual_ht), #2
+                         (0,roof_actual_ht), #3
+                         (roof_inset,0)] #4
+            tmap.append(1)
+            tmap.append(3)
+                    
+        else:
+            
+            bbtoty = bb_ln+bt_ln
+            rpathlist = [(0,0), #0
+                         (roofwidth,0), #1
+                         (roofwidth,bt_ln), #2
+                         (roofwidth,bbtoty), #3
+                         (0,bbtoty), #4
+                         (0,bt_ln), #5
+                         (0,0)] #6
+            smap.append(2)   #one end of score mark
+            smapr.append(5)  #other end of score mark
+            tmap.append(1)
+            tmap.append(4)       
+        return numpy.array(rpathlist, dtype=float),smap,smapr, tmap
+        
+    def makeChimney(self,rp,rd,ch,cw,cd,oc):
+        chholelist = []
+        tmap = [1,2,3,4,5]
+        smap =[1]
+        smapr = [5]
+        chpathlist =[]
+        fslant = 0
+        bslant = 0
+        ra = self.geo_a_b_alpha(rp,rd)	#roof angle
+        ca = 90-ra                      #outside angle
+
+        fsd = oc*cd #proportion toward front.
+        
+        bsd = cd-fsd  #the rest 
+        
+        bsh = self.geo_a_alpha_b(bsd, ca) #back side height
+        
+        fsh = self.geo_a_alpha_b(fsd,ca)  #front side height 
+        
+
+        chholelist.append((0,0))
+        if fsd> 0:
+            fslant = self.geo_a_b_c(fsd,fsh)
+        if bsd >0:
+           bslant = self.geo_a_b_c(bsd,bsh)
+           chholelist.append((bslant,0))
+        chholelist.append((bslant+fslant, 0))
+        chholelist.append((bslant+fslant,cw))
+        if bsd > 0:
+            chholelist.append((bslant,cw))
+        chholelist.append((0,cw))
+        chholelist.append((0,0))
+        if (bsd > 0) and (fsd >0):
+            chholescore = [1]
+            chholescore2 = [4]
+        
+            
+        cpathx = [0, bsd, cd, cd+cw,  cw+(2*cd)-bsd, (2*cd)+cw, 2*(cd+cw)]
+        cpathy = [ch+bsh,ch,ch+fsh,ch+fsh,ch,ch+bsh,ch+bsh]
+        
+        chpathlist.append((0,0))
+        
+        plen = len(cpathx)
+        for i in range(1,plen):
+            if cpathx[i]  != chpathlist[-1][0]:
+                chpathlist.append((cpathx[i],0))
+                
+        for i in reversed(range(plen)):
+            yp = cpathy[i]
+            if not ((cpathx[i] == chpathlist[-1][0]) and  (yp == chpathlist[-1][1])):
+                chpathlist.append((cpathx[i],yp))
+        chpathlist.append((0,0))
+        if len(chpathlist) == 11:  #this is not off-center
+            smap = [1,2,3]
+            smapr = [8,7,6]
+            tmap = [5,6,7,8,9]
+        else:
+            tmap= [7,8,9,10,11,12,13]
+            smap = [2,3,5]
+            smapr = [11,10,8]
+            
+            
+        #and the hole template:
+        #add a node to the end so it cuts fully
+        chholelist.append(chholelist[0])
+        return(numpy.array(chpathlist, dtype=float),smap,smapr,tmap,numpy.array(chholelist, dtype=float),chholescore,chholescore2)
+        
+        
+    def roofbasenodes(self,roofwidth,roofdepth):
+        rbaselist = [(0,0), #0
+                     (roofwidth,0), #1
+                     (roofwidth,roofdepth), #2
+                     (0,roofdepth), #3
+                     (0,0)] #4
+        return numpy.array(rbaselist, dtype=float)
+
+
+        
+
+
+def kitoptions(params, scale=1.0):
+    # Fill in defaults and convert the raw option values (strings from the command line are fine)
+    # to numbers, with every length multiplied by scale (user units per dimensional unit)
+    opts = dict(DEFAULTS)
+    for key, value in params.items():
+        if value is not None:
+            opts[key] = value
+    kopts = {}
+    kopts['unit'] = opts['unit']
+    kopts['scoretype'] = opts['scoretype']
+    kopts['isbarn'] = str(opts['isbarn']) == "True"
+    kopts['sides'] = int(opts['sides'])
+    kopts['tabmode'] = opts['tabmode']
+    kopts['layout'] = str(opts['layout']) == "True"
+    kopts['layout_rotate'] = str(opts['layout_rotate']) == "True"
+    kopts['validate'] = str(opts['validate']) == "True"
+    for key in ('dormerht', 'dormertopht', 'basewidth', 'roofpeak', 'roofdepth', 'roofwidth',
+                'roof_inset', 'basecutout', 'stickout', 'chimney_ht', 'chimney_wd', 'chimney_depth',
+                'sheet_width', 'sheet_height', 'sheet_margin', 'piece_spacing'):
+        kopts[key] = float(opts[key])*scale
+    kopts['paper'] = float(opts['paper']) * scale * 2.0
+    for key in ('bhratio', 'bdratio', 'window_frame', 'off_center', 'shrink'):
+        kopts[key] = float(opts[key])
+    kopts['scale'] = scale
+    return kopts
+
+
+def kitconstants(o):
+    # tab height, dash length and tab angle for the pieces, from the scale and score type
+    scale = o['scale']
+    tabht = 0.25*scale
+    if o['scoretype'] == "dash" or o['scoretype'] == "dasharray":
+        dashln = 0.1*scale
+    else:
+        dashln = 0
+    tabangle = 45
+    return tabht, dashln, tabangle
+
+
+def roofframe(geo, o):
+    # the roof measurements the pieces are worked out from
+    f = {}
+    roofpeak = o['roofpeak']
+    halfdepth = o['roofdepth']/2
+    f['halfdepth'] = halfdepth
+    f['base_angle'] = geo.geo_a_b_alpha(roofpeak, halfdepth)
+    f['roof_actual_ht'] = roof_actual_ht = geo.geo_a_b_c(roofpeak, halfdepth)
+    if math.isclose(o['roof_inset'],0,abs_tol=1e-09):
+        f['side_inset_ht'] = roofpeak
+    else :
+        roof_inset_ht = geo.geo_a_b_c(roof_actual_ht,o['roof_inset'])
+        f['side_inset_ht'] = geo.geo_c_a_b(roof_inset_ht, halfdepth)
+    f['btx'] = btx = o['bdratio']*halfdepth
+    f['bty'] = bty = roofpeak*o['bhratio']
+    f['bbx'] = bbx = halfdepth - btx
+    f['bby'] = bby = roofpeak-bty
+    if o['isbarn']:
+        f['barn_base_angle'] = geo.geo_a_b_alpha(bby, bbx)
+    f['bt_ln'] = geo.geo_a_b_c(bbx,bty)
+    #fixed 12-31-2021
+    f['bb_ln'] = geo.geo_a_b_c(btx,bby)
+    return f
+
+
+def dormerframe(o):
+    # (dormertopht, baseht, isabase, notop), or None when there are no dormers
+    dormerht = o['dormerht']
+    dormertopht = o['dormertopht']
+    if math.isclose(dormerht,0,abs_tol=1e-09):
+        return None
+    if (dormertopht > dormerht):  #don't allow nonsensical number the top can't be larger than the whole thing
+        dormertopht = dormerht
+    baseht = dormerht - dormertopht
+    isabase = not math.isclose(baseht,0,abs_tol=1e-09)
+    notop = math.isclose(o['dormertopht'],0,abs_tol=1e-09)
+    return dormertopht, baseht, isabase, notop
+
+
+# Each node of the kit's build graph below works out part of the kit from the
+# options it reads and the results of the nodes it needs.  Node results may be
+# handed to later builds, so a node must not change what it is given.
+
+def roofbasepieces(geo, o, got):
+    #ROOF BASE
+    tabht, dashln, tabangle = kitconstants(o)
+    roofwidth = o['roofwidth']
+    roofdepth = o['roofdepth']
+    basecutout = o['basecutout']
+    mincutout= tabht
+    maxcutout1 = .5*roofwidth
+    maxcutout2 = .5*roofdepth
+    maxcutout = min(maxcutout1,maxcutout2)
+    if (basecutout < mincutout):
+        basecutout = mincutout
+    if (basecutout >= maxcutout):
+        basecutout = 0
+    cutout = -basecutout
+    roofbaselist = geo.roofbasenodes(roofwidth,roofdepth)
+    #no scorelines, no tabs, just an inset
+    return [geo.makepiece(roofbaselist,[],[],[],False,cutout,roofbaselist,"Roof_Base",'struct',tabht,dashln,tabangle,True,False,True)]
+
+
+def roofsidepieces(geo, o, got):
+    #ROOF SIDE AND ROOF SIDE DECO
+    tabht, dashln, tabangle = kitconstants(o)
+    f = roofframe(geo, o)
+    roofsidelist,roofsidescore,roofsidescore2,roofsidetabs = geo.roofsidenodes(f['halfdepth'],f['side_inset_ht'],f['bbx'],f['bty'],o['roofpeak'],o['isbarn'])
+    #fixed 12-31-2021
+    roofside = geo.makemodel(roofsidelist,roofsidescore,roofsidescore2,roofsidetabs,True,0,[],tabht,dashln,tabangle,True,False)
+    pieces = [roofside.piece("Side_of_Roof",'struct')]
+    #the second side is the same piece again
+    pieces.append(pieces[-1].copy("Side_of_Roof2"))
+    #and the deco is the side without its tabs
+    pieces.append(roofside.piece("Side_of_RoofDeco",'deco',tabs=[]))
+    pieces.append(pieces[-1].copy("Side_of_RoofDeco2"))
+    return pieces
+
+
+def roofmainpieces(geo, o, got):
+    #ROOF MAIN, ROOF MAIN 2 AND ROOF MAIN DECO
+    tabht, dashln, tabangle = kitconstants(o)
+    f = roofframe(geo, o)
+    roof_top_width = o['roofwidth']-(2*o['roof_inset'])
+    roofmainlist,roofmainscore,roofmainscore2,roofmaintabs = geo.roofmainnodes(o['roof_inset'],roof_top_width,o['roofwidth'],f['roof_actual_ht'],f['bbx'],f['bby'],f['btx'],f['bty'],f['bb_ln'],f['bt_ln'],o['isbarn'])
+    roofmain = geo.makemodel(roofmainlist,roofmainscore, roofmainscore2,roofmaintabs,False,0,[],tabht,dashln,tabangle,False,False)
+    pieces = [roofmain.piece("Main_Roof",'struct')]
+    #remove the top tab on this one,but leave the bottom
+    pieces.append(roofmain.piece("Main_Roof_2",'struct',tabs=roofmaintabs[1:]))
+    pieces.append(roofmain.piece("Main_Roof_Deco",'deco',tabs=[]))
+    pieces.append(pieces[-1].copy("Main_Roof_Deco2"))
+    return pieces
+
+
+def dormerprofile(geo, o, got):
+    # the dormer's top nodes and edge lengths, (nodes, lenlist); () with no dormers
+    dormer = dormerframe(o)
+    if dormer is None:
+        return ()
+    dormertopht, baseht, isabase, notop = dormer
+    return geo.nodesloc(o['basewidth'],baseht,dormertopht,o['sides'],isabase,notop)
+
+
+def dormerfrontpieces(geo, o, got):
+    #DORMERS FRONT PANE, FRONT AND FRONT DECO
+    dormer = dormerframe(o)
+    if dormer is None:
+        return []
+    dormertopht, baseht, isabase, notop = dormer
+    tabht, dashln, tabangle = kitconstants(o)
+    nodes, lenlist = got['dormer_profile']
+    basewidth = o['basewidth']
+    dhalfwidth = .5*basewidth
+    peaky = 0
+    window_frame = o['window_frame']
+    window_inset = window_frame*basewidth
+    if (window_inset> dhalfwidth) or  (window_inset>.5 * peaky):
+        window_inset = window_frame * min(dhalfwidth*.75, peaky)
+    if peaky == 0:
+        window_inset = window_frame*basewidth
+    cutout = -window_inset
+
+    frontlist,frontshortlist,frontscore,frontscore2,fronttabs = geo.frontnodes(nodes,o['stickout'],basewidth,baseht,notop) #front of dormer
+    zerotab = True  #add a tab between start and end nodes
+    pieces = [geo.makepiece(frontlist,frontscore,frontscore2,fronttabs,zerotab,cutout,frontshortlist,"Front_Path",'struct',tabht,dashln/2,tabangle,True,False,isabase)]
+    #DOING DECO
+    pieces.append(geo.makepiece(frontshortlist,[],[],[],not zerotab,cutout,frontshortlist,"Front_Deco_Path",'deco',tabht,dashln,tabangle,True,False,isabase))
+    return pieces
+
+
+def dormersidepieces(geo, o, got):
+    #HOLE AND DORMER SIDE
+    dormer = dormerframe(o)
+    if dormer is None:
+        return []
+    dormertopht, baseht, isabase, notop = dormer
+    tabht, dashln, tabangle = kitconstants(o)
+    nodes, lenlist = got['dormer_profile']
+    f = roofframe(geo, o)
+    #HOLE 12-30
+    base_angle = f['barn_base_angle'] if o['isbarn'] else f['base_angle']
+    holepathlist = geo.holenodes(nodes,baseht,o['basewidth'],base_angle,isabase) #hole path
+    pieces = [geo.makepiece(holepathlist,[],[],[],0,o['paper'],holepathlist,"Hole",'hole',tabht,dashln,tabangle,True,True,isabase)]
+    #DORMER SIDE
+    #
+    #alter svgside to allow us to retrieve the decorative scorelines as well: decosmap and decosmapr
+    sidepathlist,sidescores,sidescores2,sidetabs,decosmap,decosmapr = geo.sidenodes(lenlist,nodes,isabase,base_angle,baseht,o['stickout'],o['sides'],notop,o['basewidth']) #side of dormer
+    dormerside = geo.makemodel(sidepathlist,sidescores,sidescores2,sidetabs,False,0,[],tabht,dashln/2,tabangle/2,True,False)
+    pieces.append(dormerside.piece("Dormer_Side",'struct'))
+    #now draw the decorative piece and score lines
+    pieces.append(dormerside.piece("Dormer_Side_Deco",'deco',tabs=[],scores=dormerside.scorelines(decosmap,decosmapr),dashlength=dashln))
+    return pieces
+
+
+def chimneypieces(geo, o, got):
+    #CHIMNEY
+    chimney_ht = o['chimney_ht']
+    chimney_wd = o['chimney_wd']
+    chimney_depth = o['chimney_depth']
+    shrink = o['shrink']
+    if (chimney_wd==0) or (chimney_depth==0) or chimney_ht ==0:
+        return []
+    tabht, dashln, tabangle = kitconstants(o)
+    chimneylist,chscores, chscores2,chtabs,chholelist,chholescore,chholescore2=geo.makeChimney(o['roofpeak'],o['roofdepth'],chimney_ht,chimney_wd,chimney_depth,o['off_center'])
+    chimney = geo.makemodel(chimneylist,chscores,chscores2, chtabs,False,0,chimneylist,tabht*shrink,dashln*shrink,tabangle*shrink,True,False)
+    pieces = [chimney.piece("Chimney",'struct')]
+    pieces.append(chimney.piece("Chimneydeco",'deco',tabs=[],dashlength=dashln))
+    #test
+    #chholelist is closed twice over; the inset is worked from it closed once
+    pieces.append(geo.makepiece(chholelist,chholescore,chholescore2,[],False,-o['paper'],chholelist[:-1],"Chimneyhole",'hole',tabht,dashln,tabangle,True,True,True))
+    return pieces
+
+
+class roofNode(object):
+    # One step of the build: reads names the options it uses, needs the nodes whose
+    # results it takes, and build(geo, options, results) does the work.  Nodes that
+    # make pieces return a list of them, in drawing order.
+    def __init__(self, name, reads, needs, build, pieces=True):
+        self.name = name
+        self.reads = reads
+        self.needs = needs
+        self.build = build
+        self.pieces = pieces
+
+# options every piece depends on: sizes of tabs and dashes, how tabs are placed
+PIECEOPTS = ('scale', 'scoretype', 'tabmode')
+ROOFOPTS = ('roofpeak', 'roofdepth', 'roof_inset', 'bhratio', 'bdratio', 'isbarn')
+DORMEROPTS = ('dormerht', 'dormertopht', 'basewidth', 'sides')
+
+# the nodes in build order; the kit's pieces are those of the piece nodes, in this order
+GRAPH = (
+    roofNode('roof_base', PIECEOPTS + ('roofwidth', 'roofdepth', 'basecutout'), (), roofbasepieces),
+    roofNode('roof_sides', PIECEOPTS + ROOFOPTS, (), roofsidepieces),
+    roofNode('roof_main', PIECEOPTS + ROOFOPTS + ('roofwidth',), (), roofmainpieces),
+    roofNode('dormer_profile', DORMEROPTS, (), dormerprofile, pieces=False),
+    roofNode('dormer_front', PIECEOPTS + DORMEROPTS + ('stickout', 'window_frame'), ('dormer_profile',), dormerfrontpieces),
+    roofNode('dormer_side', PIECEOPTS + DORMEROPTS + ROOFOPTS + ('stickout', 'paper'), ('dormer_profile',), dormersidepieces),
+    roofNode('chimney', PIECEOPTS + ('roofpeak', 'roofdepth', 'chimney_ht', 'chimney_wd', 'chimney_depth',
+        'off_center', 'shrink', 'paper'), (), chimneypieces),
+)
+
+
+_pool = None
+_pooljobs = 0
+
+
+def workerpool(jobs):
+    # a process pool of jobs workers, kept for the next build that asks for as many
+    global _pool, _pooljobs
+    if _pool is not None and _pooljobs != jobs:
+        _pool.shutdown()
+        _pool = None
+    if _pool is None:
+        from concurrent.futures import ProcessPoolExecutor
+        _pool = ProcessPoolExecutor(max_workers=jobs)
+        _pooljobs = jobs
+    return _pool
+
+
+def buildnode(geoclass, tabmode, dasharray, name, opts, got):
+    # build one node of GRAPH in a worker process; returns its result, its tab counts
+    # and how long it took
+    geo = geoclass()
+    geo.tabmode = tabmode
+    geo.dasharray = dasharray
+    for node in GRAPH:
+        if node.name == name:
+            start = time.perf_counter()
+            result = geo.makenode(node, opts, got)
+            return result, geo.tabstats, time.perf_counter() - start
+    raise KeyError(name)
+
+
+def build_roof(params, scale=1.0, geo=None, jobs=1):
+    # Compute every piece of a roof kit.  params uses the extension option names
+    # (roofwidth, roofdepth, roofpeak, sides, isbarn, chimney_ht, ...) in dimensional
+    # units; scale is the number of user units per dimensional unit.  geo is the
+    # RoofGeometry to work with (a subclass can watch or replace stages); default a new one.
+    # The nodes of GRAPH whose options are the same as in an earlier build come from
+    # geo.nodes; kit.nodestats says which nodes were built and which reused, the seconds
+    # each built one took and the names of the pieces each piece node made.  Pieces
+    # may be shared with earlier kits that way, so treat them as read-only.
+    # With jobs above 1 (0 for one per CPU) the nodes that make pieces are built at the
+    # same time on a pool of that many worker processes, once the nodes they need are
+    # built here; the pieces still come out in GRAPH order, the same as a serial build.
+    if geo is None:
+        geo = RoofGeometry()
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    opts = kitoptions(params, scale)
+    geo.tabmode = opts['tabmode']
+    geo.dasharray = opts['scoretype'] == "dasharray"
+    kit = Kit(opts, scale)
+    keys = {}
+    got = {}
+    built = {}
+    waiting = []
+    for node in GRAPH:
+        key = (node.name, tuple(opts[name] for name in node.reads), tuple(keys[name] for name in node.needs))
+        keys[node.name] = key
+        found = geo.nodes.get(key)
+        if found is None:
+            if jobs > 1 and node.pieces:
+                # no node needs pieces, so these can wait for the pool
+                waiting.append(node)
+                continue
+            before = dict(geo.tabstats)
+            start = time.perf_counter()
+            result = geo.makenode(node, opts, got)
+            built[node.name] = time.perf_counter() - start
+            geo.nodes.put(key, (result, dict((name, geo.tabstats[name] - before[name]) for name in before)))
+        else:
+            result, tabstats = found
+            for name, count in tabstats.items():
+                geo.tabstats[name] += count
+        got[node.name] = result
+    if waiting:
+        pool = workerpool(jobs)
+        futures = [pool.submit(buildnode, type(geo), geo.tabmode, geo.dasharray, node.name, opts,
+                               dict((name, got[name]) for name in node.needs)) for node in waiting]
+        for node, future in zip(waiting, futures):
+            result, tabstats, built[node.name] = future.result()
+            for name, count in tabstats.items():
+                geo.tabstats[name] += count
+            geo.nodes.put(keys[node.name], (result, tabstats))
+            got[node.name] = result
+    kit.nodestats = {'built': [node.name for node in GRAPH if node.name in built],
+                     'reused': [node.name for node in GRAPH if node.name not in built],
+                     'seconds': dict((node.name, built[node.name]) for node in GRAPH if node.name in built),
+                     'pieces': {}}
+    for node in GRAPH:
+        if node.pieces:
+            kit.pieces.extend(got[node.name])
+            kit.nodestats['pieces'][node.name] = [piece.name for piece in got[node.name]]
+    kit.tabstats = dict(geo.tabstats)
+    kit.profilestats = geo.profiles.stats()
+    return kit
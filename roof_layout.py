@@ -0,0 +1,239 @@
+#!/usr/bin/env python
+# coding=utf-8
+#
+# Copyright (C) [2021] [Susan Zakar], [sue.zakar@gmail.com]
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# Sheet layout for Roof Maker.  Every piece comes out of build_roof at its own
+# origin; layoutpieces() packs their bounding boxes (tabs included) onto sheets
+# of a given size with a skyline packer, opening more sheets as needed, and
+# returns a transform for every piece plus how much of each sheet is used.
+# Plain numbers only, like roof_geometry.
+#
+
+import math
+
+# SVG matrix(a,b,c,d,e,f) turning a piece a quarter turn
+QUARTER = (0.0, 1.0, -1.0, 0.0, 0.0, 0.0)
+
+
+def compose(m1, m2):
+    # the SVG matrix for applying m2 and then m1
+    a1, b1, c1, d1, e1, f1 = m1
+    a2, b2, c2, d2, e2, f2 = m2
+    return (a1*a2 + c1*b2, b1*a2 + d1*b2,
+            a1*c2 + c1*d2, b1*c2 + d1*d2,
+            a1*e2 + c1*f2 + e1, b1*e2 + d1*f2 + f1)
+
+
+def piecebox(piece):
+    # (minx, miny, maxx, maxy) of everything drawn for the piece
+    xs = [x for x, y in piece.outline] + [x for x, y in piece.hole]
+    ys = [y for x, y in piece.outline] + [y for x, y in piece.hole]
+    for x1, y1, x2, y2 in piece.scores:
+        xs.extend((x1, x2))
+        ys.extend((y1, y2))
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def polyarea(points):
+    # shoelace area of a closed polygon, always positive
+    area = 0.0
+    for n in range(len(points)):
+        x1, y1 = points[n-1]
+        x2, y2 = points[n]
+        area += x1*y2 - x2*y1
+    return abs(area)/2
+
+
+def piecearea(piece):
+    # paper the piece takes up once cut out
+    if piece.hole and piece.insetonly:
+        return polyarea(piece.hole)
+    return polyarea(piece.outline) - polyarea(piece.hole)
+
+
+class skyline(object):
+    # Bottom-left skyline packer for one sheet of the given inner width and height.
+    # The skyline is a list of [x, y, width] segments across the sheet; y grows down
+    # the page, so a rectangle goes where its bottom edge ends up highest (least y).
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.segments = [[0.0, 0.0, width]]
+
+    def fit(self, index, w, h):
+        # y for a w x h rectangle whose left edge is at segment index, or None
+        x = self.segments[index][0]
+        if x + w > self.width + 1e-9:
+            return None
+        y = 0.0
+        left = w
+        i = index
+        while left > 1e-9:
+            sx, sy, sw = self.segments[i]
+            y = max(y, sy)
+            if y + h > self.height + 1e-9:
+                return None
+            left -= sw
+            i += 1
+        return y
+
+    def find(self, w, h):
+        # best (top, x, index, y) over the skyline for a w x h rectangle, or None
+        found = None
+        for index in range(len(self.segments)):
+            y = self.fit(index, w, h)
+            if y is not None:
+                spot = (y + h, self.segments[index][0], index, y)
+                if found is None or spot < found:
+                    found = spot
+        return found
+
+    def add(self, index, w, h, y):
+        # put the rectangle down at segment index and raise the skyline under it
+        x = self.segments[index][0]
+        self.segments.insert(index, [x, y + h, w])
+        i = index + 1
+        while i < len(self.segments):
+            sx, sy, sw = self.segments[i]
+            shrink = (x + w) - sx
+            if shrink <= 1e-9:
+                break
+            if sw - shrink > 1e-9:
+                self.segments[i] = [sx + shrink, sy, sw - shrink]
+                break
+            del self.segments[i]
+        # join neighbours at the same height
+        i = 0
+        while i < len(self.segments) - 1:
+            if abs(self.segments[i][1] - self.segments[i+1][1]) <= 1e-9:
+                self.segments[i][2] += self.segments[i+1][2]
+                del self.segments[i+1]
+            else:
+                i += 1
+
+
+class Sheet(object):
+    # one sheet of the layout: origin is where it sits in the document (sheets go
+    # left to right), placements are (piece, transform) with transforms relative to it
+    def __init__(self, index, origin, width, height, margin, spacing):
+        self.index = index
+        self.origin = origin
+        self.placements = []
+        self.area = 0.0
+        self.oversize = []
+        self.packer = skyline(width - 2*margin + spacing, height - 2*margin + spacing)
+
+
+class Layout(object):
+    def __init__(self, width, height, margin, spacing):
+        self.width = width
+        self.height = height
+        self.margin = margin
+        self.spacing = spacing
+        self.sheets = []
+
+    def placement(self, piece):
+        # (sheet, transform) for piece
+        for sheet in self.sheets:
+            for placed, transform in sheet.placements:
+                if placed is piece:
+                    return sheet, transform
+        raise KeyError(piece.name)
+
+    def usage(self):
+        # fraction of each sheet covered by paper that is kept; None for a sheet given
+        # to a piece too big for it, which no fraction describes
+        return [None if sheet.oversize else sheet.area/(self.width*self.height) for sheet in self.sheets]
+
+    def report(self, unit=''):
+        lines = ['%d sheet(s) of %g x %g%s' % (len(self.sheets), self.width, self.height, unit)]
+        for sheet, used in zip(self.sheets, self.usage()):
+            if used is None:
+                line = 'sheet %d: too big for the sheet: %s' % (sheet.index + 1, ', '.join(piece.name for piece in sheet.oversize))
+            else:
+                line = 'sheet %d: %d pieces, %.0f%% used' % (sheet.index + 1, len(sheet.placements), 100*used)
+            lines.append(line)
+        return '\n'.join(lines)
+
+
+def layoutpieces(pieces, width, height, margin=0.0, spacing=0.0, rotate=False, gap=None, scale=1.0):
+    # Pack pieces onto width x height sheets, keeping margin clear round the edge
+    # and spacing between pieces; with rotate a piece may be turned a quarter turn
+    # when that packs better.  Sheets are set gap apart in the document.  The
+    # lengths are divided by scale (user units per dimensional unit) in the report.
+    if gap is None:
+        gap = 0.1*width
+    layout = Layout(width/scale, height/scale, margin/scale, spacing/scale)
+    boxes = []
+    for order, piece in enumerate(pieces):
+        minx, miny, maxx, maxy = piecebox(piece)
+        boxes.append((max(maxx - minx, maxy - miny), order, piece, (minx, miny, maxx, maxy)))
+    # biggest first packs tightest; the order keeps equal pieces stable
+    boxes.sort(key=lambda b: (-b[0], b[1]))
+    sheets = []
+
+    def newsheet():
+        sheet = Sheet(len(sheets), len(sheets)*(width + gap), width, height, margin, spacing)
+        sheets.append(sheet)
+        return sheet
+
+    for size, order, piece, (minx, miny, maxx, maxy) in boxes:
+        w = maxx - minx
+        h = maxy - miny
+        shapes = [(w + spacing, h + spacing, False)]
+        if rotate and not math.isclose(w, h):
+            shapes.append((h + spacing, w + spacing, True))
+        best = None
+        for sheet in sheets:
+            for sw, sh, turned in shapes:
+                spot = sheet.packer.find(sw, sh)
+                if spot is not None and (best is None or spot < best[0]):
+                    best = (spot, sheet, sw, sh, turned)
+            if best is not None:
+                break  # first sheet that has room
+        if best is None:
+            sheet = newsheet()
+            for sw, sh, turned in shapes:
+                spot = sheet.packer.find(sw, sh)
+                if spot is not None and (best is None or spot < best[0]):
+                    best = (spot, sheet, sw, sh, turned)
+        if best is None:
+            # bigger than a sheet: it gets a sheet of its own, at the margin
+            sheet.oversize.append(piece)
+            sheet.packer.segments = [[0.0, sheet.packer.height, sheet.packer.width]]
+            x = y = 0.0
+            turned = False
+        else:
+            (top, x, index, y), sheet, sw, sh, turned = best
+            sheet.packer.add(index, sw, sh, y)
+        x += margin
+        y += margin
+        if turned:
+            # a quarter turn takes (x,y) to (-y,x)
+            transform = compose((1.0, 0.0, 0.0, 1.0, x + maxy, y - minx), QUARTER)
+        else:
+            transform = (1.0, 0.0, 0.0, 1.0, x - minx, y - miny)
+        sheet.placements.append((piece, transform))
+        sheet.area += piecearea(piece)/(scale*scale)
+
+    # keep the kit's drawing order within each sheet
+    order = dict((id(piece), n) for n, piece in enumerate(pieces))
+    for sheet in sheets:
+        sheet.placements.sort(key=lambda p: order[id(p[0])])
+    layout.sheets = sheets
+    return layout
@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+# coding=utf-8
+#
+# Copyright (C) [2021] [Susan Zakar], [sue.zakar@gmail.com]
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# Run-time profiling for Roof Maker (the --profile option).  Records wall time,
+# call count and peak traced memory for each stage of the geometry, for each node
+# of the build graph (with the names of the pieces it made) and for each piece as
+# it is drawn, and writes them to a JSON file.  Optionally a cProfile of the whole
+# run or the top tracemalloc allocation sites go with it.
+#
+
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# RoofGeometry methods timed as stages when a geometry is watched
+STAGES = ('nodesloc', 'topnodescalc', 'ellipseg', 'sidenodes', 'holenodes', 'frontnodes',
+          'roofsidenodes', 'roofmainnodes', 'roofbasenodes', 'makeChimney', 'makemodel',
+          'tabsides', 'makeTab', 'insetPolygon', 'makescores')
+
+CAPTURES = ('none', 'cprofile', 'tracemalloc')
+
+
+class stageProfiler(object):
+    # Times are inclusive: a stage's time counts the stages it calls.  Peak memory
+    # is the most traced memory above what was in use when the stage started.
+    def __init__(self, capture='none'):
+        if capture not in CAPTURES:
+            raise ValueError('profile capture must be one of %s' % ', '.join(CAPTURES))
+        self.capture = capture
+        self.stages = {}
+        self.nodes = {}
+        self.pieces = {}
+        self.made = {}  # node name: names of the pieces it made
+        self.frames = []
+        self.profile = None
+        self.snapshot = None
+        self.started = None
+        self.elapsed = 0.0
+        self.tracing = False
+
+    @contextmanager
+    def running(self):
+        # profile everything inside the with block
+        self.tracing = not tracemalloc.is_tracing()
+        if self.tracing:
+            tracemalloc.start(25 if self.capture == 'tracemalloc' else 1)
+        if self.capture == 'cprofile':
+            import cProfile
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+        self.started = time.perf_counter()
+        try:
+            with self.stage('total'):
+                yield self
+        finally:
+            self.elapsed = time.perf_counter() - self.started
+            if self.profile is not None:
+                self.profile.disable()
+            if self.capture == 'tracemalloc':
+                self.snapshot = tracemalloc.take_snapshot()
+            if self.tracing:
+                tracemalloc.stop()
+
+    @contextmanager
+    def stage(self, name, table=None):
+        # one call of stage name (or of a piece, with table=self.pieces)
+        if table is None:
+            table = self.stages
+        current, peak = tracemalloc.get_traced_memory()
+        if self.frames:
+            # the enclosing stage keeps the peak it had reached before this one resets it
+            self.frames[-1][1] = max(self.frames[-1][1], peak)
+        if hasattr(tracemalloc, 'reset_peak'):  # Python 3.9 and up; before that peaks cover the run so far
+            tracemalloc.reset_peak()
+        frame = [current, current]
+        self.frames.append(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            self.frames.pop()
+            peak = max(tracemalloc.get_traced_memory()[1], frame[1])
+            if self.frames:
+                self.frames[-1][1] = max(self.frames[-1][1], peak)
+            entry = table.setdefault(name, {'calls': 0, 'seconds': 0.0, 'peak_bytes': 0})
+            entry['calls'] += 1
+            entry['seconds'] += seconds
+            entry['peak_bytes'] = max(entry['peak_bytes'], peak - frame[0])
+
+    def piece(self, name):
+        return self.stage(name, self.pieces)
+
+    def watch(self, obj, names=STAGES):
+        # time the named methods of obj (on this instance only) as stages, and each
+        # build graph node that a RoofGeometry makes
+        for name in names:
+            method = getattr(obj, name, None)
+            if method is not None:
+                setattr(obj, name, self.timed(name, method))
+        method = getattr(obj, 'makenode', None)
+        if method is not None:
+            def makenode(node, opts, got):
+                with self.stage(node.name, self.nodes):
+                    return method(node, opts, got)
+            obj.makenode = makenode
+        return obj
+
+    def timed(self, name, method):
+        def call(*args, **kwargs):
+            with self.stage(name):
+                return method(*args, **kwargs)
+        return call
+
+    def built(self, kit):
+        # note which pieces each node of kit made; nodes built by worker processes
+        # (--jobs) weren't seen here, so they get the time the worker took, without memory
+        for name, seconds in kit.nodestats.get('seconds', {}).items():
+            if name not in self.nodes:
+                self.nodes[name] = {'calls': 1, 'seconds': seconds, 'peak_bytes': None}
+        self.made.update(kit.nodestats.get('pieces', {}))
+
+    def report(self, top=30):
+        def table(entries):
+            rows = []
+            for name, entry in sorted(entries.items(), key=lambda item: -item[1]['seconds']):
+                row = dict(entry, name=name)
+                row['seconds'] = round(row['seconds'], 6)
+                rows.append(row)
+            return rows
+        report = {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'seconds': round(self.elapsed, 6),
+            'capture': self.capture,
+            'stages': table(self.stages),
+            'nodes': table(self.nodes),
+            'pieces': table(self.pieces),
+        }
+        # the geometry of a piece is timed with the node that made it, and its drawing on its own
+        for row in report['nodes']:
+            row['pieces'] = self.made.get(row['name'], [])
+        for row in report['pieces']:
+            row['node'] = next((name for name, pieces in self.made.items() if row['name'] in pieces), None)
+        if self.profile is not None:
+            import pstats
+            stats = pstats.Stats(self.profile)
+            functions = []
+            for (filename, line, func), (cc, nc, tt, ct, callers) in stats.stats.items():
+                functions.append({'function': '%s:%d(%s)' % (os.path.basename(filename), line, func),
+                                  'calls': nc, 'self_seconds': round(tt, 6), 'seconds': round(ct, 6)})
+            functions.sort(key=lambda f: -f['seconds'])
+            report['cprofile'] = functions[:top]
+        if self.snapshot is not None:
+            sites = []
+            for stat in self.snapshot.statistics('lineno')[:top]:
+                frame = stat.traceback[0]
+                sites.append({'site': '%s:%d' % (os.path.basename(frame.filename), frame.lineno),
+                              'bytes': stat.size, 'blocks': stat.count})
+            report['tracemalloc'] = sites
+        return report
+
+    def write(self, path):
+        # the JSON report goes to path; a cProfile capture also goes to path with .prof
+        with open(path, 'w') as stream:
+            json.dump(self.report(), stream, indent=1)
+            stream.write('\n')
+        if self.profile is not None:
+            self.profile.dump_stats(os.path.splitext(path)[0] + '.prof')
+        return path
+
+    def summary(self, count=5):
+        # a few lines for the user: the slowest stages and pieces
+        lines = ['Roof Maker took %.3fs' % self.elapsed]
+        def named(name):
+            if name in self.made:
+                return '%s (%s)' % (name, ' '.join(self.made[name]))
+            return name
+        for title, entries in (('stages', self.stages), ('geometry', self.nodes), ('pieces drawn', self.pieces)):
+            slow = sorted(((e['seconds'], n) for n, e in entries.items() if n != 'total'), reverse=True)[:count]
+            lines.append('slowest %s: %s' % (title, ', '.join('%s %.1fms' % (named(n), 1000*s) for s, n in slow)))
+        return '\n'.join(lines)
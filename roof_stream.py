@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# coding=utf-8
+#
+# Copyright (C) [2021] [Susan Zakar], [sue.zakar@gmail.com]
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# Streamed SVG output for Roof Maker batches.  Drawing a kit through the extension
+# keeps the whole document until it is saved; svgStream writes the template's head,
+# then each piece as soon as stringmeup has drawn it (the element is dropped straight
+# after), then the template's tail.  Memory stays at one piece and one Kit however
+# many kits go into the stream, so a batch can put thousands of kits in one file
+# or on stdout, each on its own layer, or stream each kit to a file of its own.
+#
+#   with open('roofs.svg', 'wb') as out:
+#       stream = svgStream(out)
+#       for name, args in kits:
+#           stream.kit(args, name)
+#       stream.close()
+#
+# The pieces are written as drawkit would draw them, on layout sheets when asked,
+# with any crossing cut lines marked.  Repeated pieces are always drawn in full:
+# clones would need a <defs> that lasts until the end of the document.
+#
+
+import io
+
+from lxml import etree
+from roof_geometry import build_roof
+from Roof_Maker import Roofmaker
+from inkex import Group, Layer, Transform
+
+# the comment that marks where the streamed elements start
+MARK = 'roof-maker-stream'
+MARKTEXT = b'<!--' + MARK.encode() + b'-->'
+
+
+class svgStream(object):
+    # Writes kits to out (a binary stream) inside template.  With layers each kit
+    # goes on a layer of its own, labelled with its name; without, the pieces go
+    # straight into the template's current layer, as the extension draws them.
+    def __init__(self, out, template=None, layers=True):
+        if template is None:
+            from roof_batch import TEMPLATE as template
+        self.out = out
+        self.layers = layers
+        self.kits = 0
+        ext = Roofmaker()
+        ext.parse_arguments([])
+        self.document = ext.load(io.BytesIO(template))
+        self.svg = self.document.getroot()
+        self.layer = self.svg.get_current_layer()
+        # everything drawn goes after this mark, and is written from there
+        self.mark = etree.Comment(MARK)
+        self.layer.append(self.mark)
+        text = self.svg.tostring()
+        start = text.index(MARKTEXT)
+        self.tail = text[start + len(MARKTEXT):]
+        out.write(text[:start])
+
+    def flush(self):
+        # write out the elements after the mark, and drop them
+        text = etree.tostring(self.layer, with_tail=False)
+        start = text.index(MARKTEXT) + len(MARKTEXT)
+        self.out.write(text[start:text.rindex(b'</')])
+        for el in list(self.mark.itersiblings()):
+            self.layer.remove(el)
+
+    def opentag(self, el):
+        # write the start tag of el, added after the mark; returns the end tag for later
+        el.append(etree.Comment(MARK))
+        text = etree.tostring(self.layer, with_tail=False)
+        start = text.index(MARKTEXT) + len(MARKTEXT)
+        inner = text.index(MARKTEXT, start)
+        self.out.write(text[start:inner])
+        end = inner + len(MARKTEXT)
+        self.layer.remove(el)
+        return text[end:text.rindex(b'</')]
+
+    def kit(self, args, name=None, number=None):
+        # build the kit for args (the extension's command line) and write it; returns the Kit.
+        # number (default: how many kits the stream has had) makes the layer's id
+        ext = Roofmaker()
+        ext.parse_arguments(args)
+        ext.document = self.document
+        ext.svg = self.svg
+        options = ext.options
+        scale = self.svg.unittouu('1'+options.unit)
+        kit = ext.kit = build_roof(vars(options), scale, None, options.jobs)
+        self.kits += 1
+        number = number or self.kits
+        close = b''
+        if self.layers:
+            layer = Layer()
+            layer.set('id', 'kit%d' % number)
+            layer.label = name or 'kit%d' % number
+            close = self.opentag(self.layer.add(layer))
+        if options.layout == 'True':
+            from roof_layout import layoutpieces
+            kit.layout = layoutpieces(kit.pieces, options.sheet_width*scale, options.sheet_height*scale,\
+                options.sheet_margin*scale, options.piece_spacing*scale, options.layout_rotate == 'True', scale=scale)
+            for sheet in kit.layout.sheets:
+                group = Group()
+                group.label = 'Sheet_%d' % (sheet.index + 1)
+                if sheet.origin:
+                    group.transform = Transform(translate=(sheet.origin, 0))
+                end = self.opentag(self.layer.add(group))
+                for piece, transform in sheet.placements:
+                    self.piece(ext, piece, transform)
+                self.out.write(end)
+            ext.msg(kit.layout.report(options.unit))
+        else:
+            for piece in kit.pieces:
+                self.piece(ext, piece, None)
+        if options.validate == 'True':
+            from roof_validate import checkkit
+            kit.collisions = checkkit(kit)
+            ext.diagnose(kit, self.layer)
+            self.flush()
+        self.out.write(close)
+        return kit
+
+    def piece(self, ext, piece, transform):
+        ext.stringmeup(piece, self.layer, ext.STYLES[piece.role])
+        if transform is not None:
+            el = self.layer[-1]
+            el.transform = Transform(transform) @ el.transform
+        self.flush()
+
+    def close(self):
+        self.layer.remove(self.mark)
+        self.out.write(self.tail)
@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# coding=utf-8
+#
+# Copyright (C) [2021] [Susan Zakar], [sue.zakar@gmail.com]
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# Checks the finished pieces of a Kit for cut lines that cross: a tab running
+# into the piece or into the next tab, an inset cutout crossing the outline, or
+# an inset that has folded over itself.  makeTab only checks a tab against itself,
+# so these used to turn up at the cutter.  The outline and hole edges of a piece
+# are swept left to right and only edges whose x and y ranges overlap are compared:
+# a pruned all-pairs check, not a Bentley-Ottmann sweep.  Ordinary pieces have few
+# overlapping edges and take a millisecond or two, but the worst case is O(n^2),
+# as it is for any check that lists every crossing: a many-sided dormer whose tabs
+# no longer fit has crossings between most of its tabs (686,000 at 1000 sides).
+# Plain numbers only, like roof_geometry.
+#
+
+import heapq
+
+# kinds of collision
+OUTLINE = 'outline'   # the outline (tabs included) crosses itself
+HOLE = 'hole'         # the inset cutout crosses itself
+INSET = 'inset'       # the inset cutout crosses the outline
+
+
+class Collision(object):
+    # where two cut edges of a piece meet: kind is one of OUTLINE, HOLE, INSET,
+    # x,y the crossing in the piece's coordinates, edges the two (ring, index) edges
+    def __init__(self, piece, kind, x, y, edges):
+        self.piece = piece
+        self.kind = kind
+        self.x = x
+        self.y = y
+        self.edges = edges
+    def __repr__(self):
+        return 'Collision(%s %s at %.4f,%.4f)' % (self.piece, self.kind, self.x, self.y)
+
+
+def ringedges(points, ring, tol):
+    # the edges of the closed polygon points as (x1,y1,x2,y2,ring,index),
+    # leaving out zero length edges; index counts only the edges kept
+    edges = []
+    n = len(points)
+    for i in range(n):
+        x1, y1 = points[i-1]
+        x2, y2 = points[i]
+        if abs(x2 - x1) > tol or abs(y2 - y1) > tol:
+            edges.append((x1, y1, x2, y2, ring, len(edges)))
+    return edges
+
+
+def meet(e1, e2, adjacent, tol):
+    # the point where edges e1 and e2 cross or overlap, or None.  Edges that only
+    # touch end to end don't count; neighbouring edges only count when they fold back.
+    ax, ay, bx, by = e1[:4]
+    cx, cy, dx, dy = e2[:4]
+    rx, ry = bx - ax, by - ay
+    sx, sy = dx - cx, dy - cy
+    rlen = (rx*rx + ry*ry) ** 0.5
+    slen = (sx*sx + sy*sy) ** 0.5
+    # distances of c and d from line ab, and of a and b from line cd
+    dc = (rx*(cy - ay) - ry*(cx - ax))/rlen
+    dd = (rx*(dy - ay) - ry*(dx - ax))/rlen
+    da = (sx*(ay - cy) - sy*(ax - cx))/slen
+    db = (sx*(by - cy) - sy*(bx - cx))/slen
+    if abs(dc) <= tol and abs(dd) <= tol:
+        # on one line: they collide if they overlap by more than tol
+        ux, uy = rx/rlen, ry/rlen
+        t0, t1 = sorted(((cx - ax)*ux + (cy - ay)*uy, (dx - ax)*ux + (dy - ay)*uy))
+        lo = max(0.0, t0)
+        hi = min(rlen, t1)
+        if hi - lo <= tol:
+            return None
+        t = (lo + hi)/2
+        return ax + ux*t, ay + uy*t
+    if adjacent:
+        return None
+    if ((dc > tol and dd < -tol) or (dc < -tol and dd > tol)) and \
+       ((da > tol and db < -tol) or (da < -tol and db > tol)):
+        t = dc/(dc - dd)
+        return cx + sx*t, cy + sy*t
+    return None
+
+
+def crossings(edges, sizes, tol=1e-7):
+    # (edge, edge, x, y) for every pair of the edges that collide.  sizes[ring] is how
+    # many edges that ring has, for telling which edges are neighbours.  The edges are
+    # taken in order of their left ends; the active heap holds the ones the sweep line
+    # still cuts, keyed on their right ends, and each edge is compared with every one of
+    # those whose y range meets its own.  Quadratic when most edges overlap in x.
+    found = []
+    active = []
+    for edge in sorted(edges, key=lambda e: min(e[0], e[2])):
+        left = min(edge[0], edge[2])
+        while active and active[0][0] < left - tol:
+            heapq.heappop(active)
+        low = min(edge[1], edge[3]) - tol
+        high = max(edge[1], edge[3]) + tol
+        for right, other in active:
+            if max(other[1], other[3]) < low or min(other[1], other[3]) > high:
+                continue
+            adjacent = False
+            if other[4] == edge[4]:
+                gap = abs(other[5] - edge[5])
+                adjacent = gap == 1 or gap == sizes[edge[4]] - 1
+            point = meet(other, edge, adjacent, tol)
+            if point is not None:
+                found.append((other, edge, point[0], point[1]))
+        heapq.heappush(active, (max(edge[0], edge[2]), edge))
+    return found
+
+
+def checkpiece(piece, tol=1e-7):
+    # the Collisions of one piece's cut lines
+    rings = []
+    if piece.outline and not (piece.hole and piece.insetonly):
+        rings.append(ringedges(piece.outline, 0, tol))
+    if piece.hole:
+        rings.append(ringedges(piece.hole, 1, tol))
+    sizes = {}
+    edges = []
+    for ring in rings:
+        if ring:
+            sizes[ring[0][4]] = len(ring)
+            edges.extend(ring)
+    collisions = []
+    for e1, e2, x, y in crossings(edges, sizes, tol):
+        if e1[4] != e2[4]:
+            kind = INSET
+        else:
+            kind = OUTLINE if e1[4] == 0 else HOLE
+        collisions.append(Collision(piece.name, kind, x, y, ((e1[4], e1[5]), (e2[4], e2[5]))))
+    return collisions
+
+
+def checkkit(kit, tol=1e-7):
+    # the Collisions of every piece of kit, in drawing order.  A copy that is only
+    # moved or turned (see Piece.copy) has the same collisions as its source, so the
+    # source's are mapped across instead of checked again.
+    collisions = []
+    checked = {}
+    for piece in kit.pieces:
+        source = piece.source
+        if source is not None and id(source) in checked:
+            a, b, c, d, e, f = piece.transform
+            for hit in checked[id(source)]:
+                collisions.append(Collision(piece.name, hit.kind, a*hit.x + c*hit.y + e,
+                    b*hit.x + d*hit.y + f, hit.edges))
+            continue
+        found = checkpiece(piece, tol)
+        checked[id(piece)] = found
+        collisions.extend(found)
+    return collisions
+
+
+def report(collisions):
+    # one line per piece with collisions
+    pieces = {}
+    for hit in collisions:
+        pieces.setdefault(hit.piece, []).append(hit.kind)
+    lines = []
+    for name, kinds in pieces.items():
+        counts = ', '.join('%d %s' % (kinds.count(kind), kind) for kind in (OUTLINE, INSET, HOLE) if kind in kinds)
+        lines.append('%s: %s' % (name, counts))
+    return '\n'.join(lines)
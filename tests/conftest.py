@@ -0,0 +1,21 @@
+# Roof Maker's modules sit at the top of the repository, next to Roof_Maker.py,
+# as Inkscape expects; put that directory on the path for the tests.
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from roof_geometry import RoofGeometry, nodeCache, profileCache
+
+
+class freshGeometry(RoofGeometry):
+    # builds every node and profile anew, so tests don't see each other's kits
+    nodes = nodeCache(0)
+    profiles = profileCache(0)
+
+
+@pytest.fixture
+def fresh():
+    return freshGeometry
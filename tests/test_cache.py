@@ -0,0 +1,48 @@
+# The on-disk kit cache: hits and misses, the totals shared through stats.json,
+# the running size and trimming to maxbytes.
+
+from roof_cache import cachedkit, kitCache
+
+
+def test_hit_and_miss(tmp_path):
+    cache = kitCache(str(tmp_path))
+    key = cache.key({'sides': 5}, 3.78, ('kit',))
+    assert cache.get(key) is None
+    cache.put(key, {'kit': 'a kit'})
+    assert cache.get(key) == {'kit': 'a kit'}
+    assert (cache.hits, cache.misses, cache.writes) == (1, 1, 1)
+    totals = cache.totals()
+    assert (totals['hits'], totals['misses'], totals['writes']) == (1, 1, 1)
+    assert totals['bytes'] == cache.stats()['bytes']
+
+
+def test_keys(tmp_path):
+    cache = kitCache(str(tmp_path))
+    assert cache.key({'sides': 5}, 3.78) == cache.key({'sides': '5'}, 3.78)
+    assert cache.key({'sides': 5}, 3.78) != cache.key({'sides': 6}, 3.78)
+    assert cache.key({'sides': 5}, 3.78) != cache.key({'sides': 5}, 1.0)
+    assert cache.key({'sides': 5}, 3.78, ('svg',)) != cache.key({'sides': 5}, 3.78, ('dxf',))
+
+
+def test_cachedkit(tmp_path):
+    cache = kitCache(str(tmp_path))
+    first = cachedkit({'sides': 7}, 3.78, cache)
+    again = cachedkit({'sides': 7}, 3.78, kitCache(str(tmp_path)))
+    assert [piece.outline for piece in first] == [piece.outline for piece in again]
+    totals = cache.totals()
+    # kits only: the graph nodes are counted on their own
+    assert (totals['hits'], totals['misses'], totals['writes']) == (1, 1, 1)
+    assert totals['nodewrites'] == len(first.nodestats['built']) > 0
+
+
+def test_trim(tmp_path):
+    cache = kitCache(str(tmp_path), maxbytes=3000)
+    blob = b'x'*1000
+    for n in range(10):
+        cache.put(cache.key({'sides': n}), {'blob': blob})
+    stats = cache.stats()
+    assert stats['bytes'] <= 3000 and stats['entries'] >= 1
+    assert cache.totals()['bytes'] == stats['bytes']
+    assert cache.totals()['evictions'] == 10 - stats['entries']
+    # the newest entry is kept
+    assert cache.get(cache.key({'sides': 9})) is not None
@@ -0,0 +1,25 @@
+# The build graph: a changed option rebuilds only the nodes that read it, and a
+# reused node still counts its tabs in kit.tabstats.
+
+from roof_geometry import RoofGeometry, build_roof, nodeCache
+
+
+class sharedGeometry(RoofGeometry):
+    nodes = nodeCache()
+
+
+def test_reused_nodes_count_tabs(fresh):
+    first = build_roof({}, 3.78, sharedGeometry())
+    again = build_roof({}, 3.78, sharedGeometry())
+    assert again.nodestats['built'] == []
+    assert first.tabstats['tabs'] > 0
+    assert again.tabstats == first.tabstats == build_roof({}, 3.78, fresh()).tabstats
+
+
+def test_changed_option_rebuilds_its_nodes(fresh):
+    build_roof({}, 3.78, sharedGeometry())
+    kit = build_roof({'chimney_ht': 2.5}, 3.78, sharedGeometry())
+    assert kit.nodestats['built'] == ['chimney']
+    alone = build_roof({'chimney_ht': 2.5}, 3.78, fresh())
+    assert [piece.outline for piece in kit] == [piece.outline for piece in alone]
+    assert kit.tabstats == alone.tabstats
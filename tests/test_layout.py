@@ -0,0 +1,50 @@
+# Sheet layout: placed pieces stay inside the sheet margins and never overlap, and
+# a piece too big for the sheet gets a sheet of its own with no usage figure.
+
+import pytest
+from roof_geometry import build_roof
+from roof_layout import layoutpieces, piecebox
+
+
+def placedbox(piece, transform):
+    a, b, c, d, e, f = transform
+    x0, y0, x1, y1 = piecebox(piece)
+    xs = []
+    ys = []
+    for x, y in ((x0, y0), (x0, y1), (x1, y0), (x1, y1)):
+        xs.append(a*x + c*y + e)
+        ys.append(b*x + d*y + f)
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+@pytest.mark.parametrize('params,rotate', [({}, False), ({}, True), ({'sides': 12, 'isbarn': 'True'}, True),
+                                           ({'roofwidth': 3, 'roofdepth': 2}, False)])
+def test_no_overlap(fresh, params, rotate):
+    kit = build_roof(params, 1.0, fresh())
+    width, height, margin, spacing = 24.0, 30.0, 0.5, 0.1
+    layout = layoutpieces(kit.pieces, width, height, margin, spacing, rotate)
+    placed = [piece for sheet in layout.sheets for piece, transform in sheet.placements]
+    assert sorted(map(id, placed)) == sorted(map(id, kit.pieces))
+    tol = 1e-9
+    for sheet, used in zip(layout.sheets, layout.usage()):
+        boxes = [placedbox(piece, transform) for piece, transform in sheet.placements]
+        if sheet.oversize:
+            assert used is None and len(boxes) == 1
+            continue
+        assert 0.0 < used <= 1.0
+        for x0, y0, x1, y1 in boxes:
+            assert x0 >= margin - tol and y0 >= margin - tol
+            assert x1 <= width - margin + tol and y1 <= height - margin + tol
+        for i, (ax0, ay0, ax1, ay1) in enumerate(boxes):
+            for bx0, by0, bx1, by1 in boxes[:i]:
+                # apart by at least the spacing in x or in y
+                assert ax0 >= bx1 + spacing - tol or bx0 >= ax1 + spacing - tol or \
+                       ay0 >= by1 + spacing - tol or by0 >= ay1 + spacing - tol
+
+
+def test_oversize(fresh):
+    kit = build_roof({}, 1.0, fresh())
+    layout = layoutpieces(kit.pieces, 8.5, 11.0, 0.25, 0.1)
+    assert any(sheet.oversize for sheet in layout.sheets)
+    assert all(used is None or used <= 1.0 for used in layout.usage())
+    assert '%' not in [line for line in layout.report('in').splitlines() if 'too big' in line][0]
@@ -0,0 +1,38 @@
+# preparedPolygon answers a batch of points at once; each answer has to be the
+# one PNPOLY's even-odd test (https://github.com/JoJocoder/PNPOLY) gives alone.
+
+import random
+
+import pytest
+from roof_geometry import Point, preparedPolygon
+
+
+def pnpoly(polygon, x, y):
+    # the scalar test with its bounding box check, one point at a time
+    xs = [p[0] for p in polygon]
+    ys = [p[1] for p in polygon]
+    if x < min(xs) or x > max(xs) or y < min(ys) or y > max(ys):
+        return False
+    inside = False
+    j = len(polygon) - 1
+    for i in range(len(polygon)):
+        xi, yi = polygon[i]
+        xj, yj = polygon[j]
+        if (yi > y) != (yj > y) and x < (xj - xi)*(y - yi)/(yj - yi) + xi:
+            inside = not inside
+        j = i
+    return inside
+
+
+@pytest.mark.parametrize('polygon', [
+    [(0, 0), (10, 0), (10, 10), (0, 10)],
+    [(0, 0), (10, 0), (10, 10), (5, 4), (0, 10)],               # concave
+    [(0, 0), (4, 0), (4, 3), (6, 3), (6, 0), (10, 0), (10, 5), (0, 5)],  # flat edges
+])
+def test_matches_pnpoly(polygon):
+    rand = random.Random(3)
+    points = [(rand.uniform(-2, 12), rand.uniform(-2, 12)) for n in range(500)]
+    # vertices and points level with them are the awkward cases
+    points += [(float(x), float(y)) for x, y in polygon] + [(rand.uniform(-2, 12), float(y)) for x, y in polygon]
+    got = preparedPolygon([Point(x, y) for x, y in polygon]).contains(points)
+    assert list(got) == [pnpoly(polygon, x, y) for x, y in points]
@@ -0,0 +1,132 @@
+# makescores lays out the dashes of every score line of a piece in one NumPy pass;
+# it has to give the same marks as the one-line-at-a-time loop it replaced.
+
+import math
+import random
+
+import pytest
+from roof_geometry import Point, RoofGeometry
+
+
+def makescore(pt1, pt2, dashlength):
+    # The scalar dash loop makescores replaced, kept as the reference it must match.
+    # Draws a dashed line of dashlength between two points
+    # Dash = dashlength space followed by dashlength mark
+    # if dashlength is zero, we want a solid line
+    # Returns the marks as a list of (x1,y1,x2,y2) segments
+    apt1 = Point(0.0,0.0)
+    apt2 = Point(0.0,0.0)
+    ddash = []
+    if math.isclose(dashlength, 0.0):
+
+        ddash.append((pt1.x,pt1.y,pt2.x,pt2.y))
+    else:
+        if math.isclose(pt1.y, pt2.y):
+
+            if pt1.x < pt2.x:
+                xcushion = pt2.x - dashlength
+                xpt = pt1.x
+                ypt = pt1.y
+            else:
+                xcushion = pt1.x - dashlength
+                xpt = pt2.x
+                ypt = pt2.y
+            done = False
+            while not(done):
+                if (xpt + dashlength*2) <= xcushion:
+                    xpt = xpt + dashlength
+                    ddash.append((xpt,ypt,xpt+dashlength,ypt))
+                    xpt = xpt + dashlength
+                else:
+                    done = True
+        elif math.isclose(pt1.x, pt2.x):
+
+            if pt1.y < pt2.y:
+                ycushion = pt2.y - dashlength
+                xpt = pt1.x
+                ypt = pt1.y
+            else:
+                ycushion = pt1.y - dashlength
+                xpt = pt2.x
+                ypt = pt2.y
+            done = False
+            while not(done):
+                if(ypt + dashlength*2) <= ycushion:
+                    ypt = ypt + dashlength         
+                    ddash.append((xpt,ypt,xpt,ypt+dashlength))
+                    ypt = ypt + dashlength
+                else:
+                    done = True
+        else:
+
+            if pt1.y > pt2.y:
+                apt1.x = pt1.x
+                apt1.y = pt1.y
+                apt2.x = pt2.x
+                apt2.y = pt2.y
+            else:
+                apt1.x = pt2.x
+                apt1.y = pt2.y
+                apt2.x = pt1.x
+                apt2.y = pt1.y
+            m = (apt1.y-apt2.y)/(apt1.x-apt2.x)
+            theta = math.atan(m)
+            msign = (m>0) - (m<0)
+            ycushion = apt2.y + dashlength*math.sin(theta)
+            xcushion = apt2.x + msign*dashlength*math.cos(theta)
+            xpt = apt1.x
+            ypt = apt1.y
+            done = False
+            while not(done):
+                nypt = ypt - dashlength*2*math.sin(theta)
+                nxpt = xpt - msign*dashlength*2*math.cos(theta)
+                if (nypt >= ycushion) and (((m<0) and (nxpt <= xcushion)) or ((m>0) and (nxpt >= xcushion))):
+                    # move to end of space / beginning of mark
+                    xpt = xpt - msign*dashlength*math.cos(theta)
+                    ypt = ypt - msign*dashlength*math.sin(theta)
+                    mx = xpt
+                    my = ypt
+                    # draw the mark
+                    xpt = xpt - msign*dashlength*math.cos(theta)
+                    ypt = ypt - msign*dashlength*math.sin(theta)
+                    ddash.append((mx,my,xpt,ypt))
+                else:
+                    done = True
+    return ddash
+
+
+def marks(scores, dashlength):
+    found = []
+    for x1, y1, x2, y2 in scores:
+        found.extend(makescore(Point(x1, y1), Point(x2, y2), dashlength))
+    return found
+
+
+def check(scores, dashlength):
+    expected = marks(scores, dashlength)
+    got = RoofGeometry().makescores(scores, dashlength).tolist()
+    assert len(got) == len(expected)
+    for a, b in zip(got, expected):
+        assert a == pytest.approx(b, abs=1e-9)
+
+
+@pytest.mark.parametrize('dashlength', [0.0, 0.1, 0.25, 1.0])
+def test_straight_lines(dashlength):
+    # horizontal and vertical, both ways round, and lines too short for a mark
+    check([(0, 0, 10, 0), (10, 2, 0, 2), (3, 0, 3, 7.5), (4, 7.5, 4, 0), (0, 0, 0.3, 0)], dashlength)
+
+
+@pytest.mark.parametrize('dashlength', [0.05, 0.2, 0.7])
+def test_sloped_lines(dashlength):
+    rand = random.Random(5)
+    scores = [tuple(rand.uniform(-20, 20) for i in range(4)) for n in range(200)]
+    check(scores, dashlength)
+
+
+def test_kit_scores(fresh):
+    # the score lines of a real kit
+    from roof_geometry import build_roof
+    kit = build_roof({'sides': 7, 'isbarn': 'True'}, 3.78, fresh())
+    for piece in kit.pieces:
+        if piece.scores:
+            check(piece.scores, piece.dashlength)
@@ -0,0 +1,68 @@
+# Streamed SVG: a kit written piece by piece has to come out byte for byte as the
+# extension saves it, and a stream of several kits is one document with a layer each.
+
+import io
+
+import pytest
+
+inkex = pytest.importorskip('inkex')
+
+from lxml import etree
+from roof_batch import TEMPLATE
+from roof_stream import svgStream
+from Roof_Maker import Roofmaker
+
+CASES = [[], ['--sides=12', '--isbarn=True'], ['--layout=True'],
+         ['--scoretype=dasharray', '--relative=True'], ['--sides=96', '--stickout=0.3']]
+
+
+def drawn(args):
+    ext = Roofmaker()
+    ext.parse_arguments(args)
+    ext.document = ext.load(io.BytesIO(TEMPLATE))
+    ext.effect()
+    out = io.BytesIO()
+    ext.save(out)
+    return out.getvalue()
+
+
+@pytest.mark.filterwarnings('ignore::RuntimeWarning')
+@pytest.mark.parametrize('args', CASES)
+def test_stream_matches_document(args):
+    out = io.BytesIO()
+    stream = svgStream(out, TEMPLATE, layers=False)
+    stream.kit(args)
+    stream.close()
+    assert out.getvalue() == drawn(args)
+
+
+@pytest.mark.filterwarnings('ignore::RuntimeWarning')
+def test_kits_on_layers():
+    out = io.BytesIO()
+    stream = svgStream(out, TEMPLATE)
+    for n, args in enumerate(CASES[:3]):
+        stream.kit(args, 'roof%d' % n)
+    stream.close()
+    root = etree.fromstring(out.getvalue())
+    layers = root.findall('{http://www.w3.org/2000/svg}g[@{http://www.inkscape.org/namespaces/inkscape}groupmode="layer"]')
+    labels = [layer.get('{http://www.inkscape.org/namespaces/inkscape}label') for layer in layers]
+    assert labels[-3:] == ['roof0', 'roof1', 'roof2']
+    assert all(len(layer) for layer in layers[-3:])
+    ids = [el.get('id') for el in root.iter() if el.get('id')]
+    assert len(ids) == len(set(ids))
+
+
+def test_batch_window():
+    # the batch hands results back in order with no more than window kits in flight
+    from concurrent.futures import ThreadPoolExecutor
+    from roof_batch import inorder
+    submitted = []
+    def job(n):
+        submitted.append(n)
+        return n*n
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        got = []
+        for result in inorder(pool, job, range(50), 3):
+            got.append(result)
+            assert len(submitted) <= len(got) + 3
+    assert got == [n*n for n in range(50)]
@@ -0,0 +1,38 @@
+# Tab placement: the edge-normal mode has to put every tab on the same side as the
+# probing mode, and the closed-form fit must keep every tab's sides from crossing.
+
+import itertools
+import math
+
+import pytest
+from roof_geometry import build_roof
+
+GRID = dict(sides=(0, 3, 4, 5, 7, 12, 25), isbarn=('True', 'False'), stickout=(0, 0.3), dormertopht=(0, 0.5, 2.5))
+
+
+def kits(fresh):
+    for combo in itertools.product(*GRID.values()):
+        params = dict(zip(GRID, combo))
+        yield params, build_roof(dict(params, tabmode='probe'), 3.78, fresh()), \
+            build_roof(dict(params, tabmode='normal'), 3.78, fresh())
+
+
+@pytest.mark.filterwarnings('ignore::RuntimeWarning')
+def test_normal_matches_probe(fresh):
+    for params, probe, normal in kits(fresh):
+        assert [piece.name for piece in probe] == [piece.name for piece in normal]
+        for a, b in zip(probe, normal):
+            assert len(a.outline) == len(b.outline), (params, a.name)
+            for p, q in zip(a.outline, b.outline):
+                assert p == pytest.approx(q, abs=1e-9), (params, a.name)
+        assert probe.tabstats == normal.tabstats
+
+
+@pytest.mark.parametrize('seglength,tabht,taba', [(10, 1, 45), (1, 1, 45), (1, 1, 80), (0.2, 1, 45), (3, 0.4, 30)])
+def test_fit_keeps_sides_apart(fresh, seglength, tabht, taba):
+    height, angle, result = fresh().fitTab(seglength, tabht, taba)
+    if result < 2:
+        # the sides meet seglength/2 along the edge, above the tab
+        assert height < seglength/2*math.tan(math.radians(angle))
+    assert result == 0 or (height, angle) != (tabht, taba)
+    assert height <= tabht and angle <= 88 or (height, angle) == (tabht, taba)
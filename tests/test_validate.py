@@ -0,0 +1,50 @@
+# Crossing cut lines: each kind of collision is found where it is, and a sound
+# piece or kit has none.
+
+import pytest
+from roof_geometry import Piece, build_roof
+from roof_validate import HOLE, INSET, OUTLINE, checkkit, checkpiece
+
+SQUARE = [(0.0, 0.0), (10.0, 0.0), (10.0, 10.0), (0.0, 10.0), (0.0, 0.0)]
+
+
+def piece(outline, hole=()):
+    made = Piece('test', 'struct')
+    made.outline = list(outline)
+    made.hole = list(hole)
+    return made
+
+
+def test_sound_piece():
+    assert checkpiece(piece(SQUARE, [(2, 2), (8, 2), (8, 8), (2, 8)])) == []
+
+
+def test_folded_inset():
+    # an inset that has folded over itself crosses at its middle
+    hits = checkpiece(piece(SQUARE, [(2, 2), (8, 8), (8, 2), (2, 8)]))
+    assert [hit.kind for hit in hits] == [HOLE]
+    assert (hits[0].x, hits[0].y) == pytest.approx((5.0, 5.0))
+
+
+def test_inset_crossing_outline():
+    hits = checkpiece(piece(SQUARE, [(2, 2), (12, 2), (12, 8), (2, 8)]))
+    assert sorted(hit.kind for hit in hits) == [INSET, INSET]
+    assert sorted((round(hit.x, 9), round(hit.y, 9)) for hit in hits) == [(10.0, 2.0), (10.0, 8.0)]
+
+
+def test_tab_into_piece():
+    # a tab on the bottom edge folded back up through the top edge
+    outline = [(0, 0), (4, 0), (4, 12), (6, 12), (6, 0), (10, 0), (10, 10), (0, 10), (0, 0)]
+    hits = checkpiece(piece(outline))
+    assert sorted(hit.kind for hit in hits) == [OUTLINE, OUTLINE]
+
+
+def test_touching_edges_dont_count():
+    # neighbouring edges meet end to end, and a zero length edge is left out
+    outline = [(0, 0), (10, 0), (10, 0), (10, 10), (0, 10), (0, 0)]
+    assert checkpiece(piece(outline)) == []
+
+
+@pytest.mark.parametrize('params', [{}, {'sides': 12, 'isbarn': 'True'}, {'sides': 5, 'stickout': 0.3}])
+def test_sound_kits(fresh, params):
+    assert checkkit(build_roof(params, 3.78, fresh())) == []